@@ -0,0 +1,83 @@
+"""
+Welcome banner throughput.
+
+Renders banners the old way (fonts loaded from disk per banner, default
+PNG compression, on the calling thread), then through utils.banner's
+pool, decoding the avatar each time (a cold avatar cache) and reusing one
+decoded tile (a warm cache). Prints banners per second for each.
+
+    python benchmarks/bench_welcome_banner.py [count]
+"""
+
+import asyncio
+import os
+import sys
+import time
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image, ImageDraw, ImageFont  # noqa: E402
+
+from utils import banner  # noqa: E402
+
+
+def sample_avatar() -> bytes:
+    """A 512x512 gradient PNG, roughly the size Discord serves avatars at."""
+    img = Image.radial_gradient("L").resize((512, 512)).convert("RGBA")
+    buffer = BytesIO()
+    img.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def render_baseline(avatar_bytes: bytes, name: str, member_count: int) -> bytes:
+    """The per-join rendering the welcomer used before the banner pool."""
+    base = Image.new("RGBA", banner.BANNER_SIZE, banner.BACKGROUND)
+    draw = ImageDraw.Draw(base)
+    avatar = Image.open(BytesIO(avatar_bytes)).convert("RGBA").resize(banner.AVATAR_SIZE)
+    base.paste(avatar, banner.AVATAR_POS, avatar)
+    font_big = ImageFont.truetype(banner.FONT_PATH, 50)
+    font_small = ImageFont.truetype(banner.FONT_PATH, 30)
+    draw.text((250, 80), f"Welcome, {name}!", fill=(255, 255, 255), font=font_big)
+    draw.text((250, 150), f"You’re member #{member_count}!", fill=(180, 180, 180), font=font_small)
+    buffer = BytesIO()
+    base.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def bench_baseline(avatar_bytes: bytes, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        render_baseline(avatar_bytes, f"member{i}", 1000 + i)
+    return count / (time.perf_counter() - start)
+
+
+async def bench_pool(avatar_bytes: bytes, count: int, cached: bool) -> float:
+    tile = await banner.decode_avatar(avatar_bytes)
+    await banner.render(tile, "warmup", 0)  # load fonts in the pool threads
+
+    async def one(i: int):
+        avatar = tile if cached else await banner.decode_avatar(avatar_bytes)
+        await banner.render(avatar, f"member{i}", 1000 + i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(count)))
+    return count / (time.perf_counter() - start)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    avatar_bytes = sample_avatar()
+
+    baseline = bench_baseline(avatar_bytes, count)
+    cold = asyncio.run(bench_pool(avatar_bytes, count, cached=False))
+    warm = asyncio.run(bench_pool(avatar_bytes, count, cached=True))
+
+    print(f"banners rendered: {count}")
+    print(f"{'baseline (on loop, fonts per banner)':40} {baseline:8.1f} banners/s")
+    print(f"{f'banner pool ({banner.BANNER_WORKERS} workers)':40} {cold:8.1f} banners/s  ({cold / baseline:.1f}x)")
+    print(f"{'banner pool, cached avatar tile':40} {warm:8.1f} banners/s  ({warm / baseline:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,35 +3,125 @@ from discord import app_commands
 from discord.ext import commands
 from datetime import datetime
 import os
-from supabase import create_client, Client
-from cogs.database import supabase  # ✅ This uses the existing shared client
+from utils import repository  # ✅ Async access to the shared client
+from utils.write_buffer import CoalescingBuffer
+from utils.send_scheduler import Priority, scheduler
 
 # ------------------- Role Restriction -------------------
 RESTRICTED_ROLE_ID = 1431189237687914550  # Counting Manager Role ID
 
+# ------------------- Write-Behind Settings -------------------
+STATE_FLUSH_INTERVAL = 1.0  # seconds; counting rows are small, keep them fresh
+SCORE_FLUSH_INTERVAL = 5.0
+WARM_PAGE_SIZE = 1000  # PostgREST's default row cap; pages stay within it
+
 class Counting(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # guild_id -> counting row; warmed on load so on_message never waits on Supabase
+        self.cache: dict[str, dict] = {}
+        self.cache_warm = False
+        # Coalesced writes: latest counting row per guild, score deltas per (guild, user)
+        self.pending_states = CoalescingBuffer(
+            self.flush_states,
+            interval=STATE_FLUSH_INTERVAL,
+            max_pending=100,
+            merge=lambda old, new: new,
+            name="Counting:state",
+        )
+        self.pending_scores = CoalescingBuffer(
+            self.flush_scores,
+            interval=SCORE_FLUSH_INTERVAL,
+            max_pending=500,
+            name="Counting:scores",
+        )
+
+    async def cog_load(self):
+        await self.warm_cache()
+        self.pending_states.start()
+        self.pending_scores.start()
+
+    async def cog_unload(self):
+        await self.pending_states.close()
+        await self.pending_scores.close()
+
+    async def flush_states(self, states: dict):
+        """Write the latest counting row of every changed guild in one upsert."""
+        await repository.upsert_many("counting", list(states.values()), on_conflict="guild_id")
+
+    async def flush_scores(self, deltas: dict):
+        """Add all buffered score deltas in one server-side increment."""
+        payload = [
+            {"guild_id": guild_id, "user_id": user_id, "delta": delta}
+            for (guild_id, user_id), delta in deltas.items()
+        ]
+        await repository.rpc("increment_counting_scores", {"deltas": payload})
+
+    async def warm_cache(self):
+        """
+        Load every guild that has a counting channel, paging by guild_id.
+        Only a complete load marks the cache warm, since on_message then
+        treats a missing guild as having no counting channel.
+        """
+        cache, last = {}, None
+        try:
+            while True:
+                query = (
+                    repository.table("counting").select("guild_id, channel_id, count, last_user")
+                    .not_.is_("channel_id", "null")
+                )
+                if last is not None:
+                    query = query.gt("guild_id", last)
+                rows = await repository.execute(query.order("guild_id").limit(WARM_PAGE_SIZE))
+                cache.update((str(row["guild_id"]), row) for row in rows)
+                if len(rows) < WARM_PAGE_SIZE:
+                    break
+                last = rows[-1]["guild_id"]
+        except Exception as e:
+            print(f"[Counting] ⚠️ Could not warm cache, loading guilds on demand: {e}")
+            return
+        # Keep states loaded on demand while the pages were loading.
+        for guild_id, row in cache.items():
+            self.cache.setdefault(guild_id, row)
+        self.cache_warm = True
+        print(f"✅ Counting cache warmed for {len(cache)} guild(s).")
 
     async def get_count_data(self, guild_id: int):
         """Fetch or create count data for a guild."""
-        response = supabase.table("counting").select("*").eq("guild_id", str(guild_id)).execute()
-        if response.data:
-            return response.data[0]
-
-        # Auto-create if missing
-        supabase.table("counting").insert({
-            "guild_id": str(guild_id),
-            "channel_id": None,
-            "count": 0,
-            "last_user": None,
-            "leaderboard": {}
-        }).execute()
-        return {"guild_id": str(guild_id), "channel_id": None, "count": 0, "last_user": None, "leaderboard": {}}
+        cached = self.cache.get(str(guild_id))
+        if cached:
+            return cached
+
+        row = await repository.fetch_one("counting", "guild_id, channel_id, count, last_user", guild_id=str(guild_id))
+        if not row:
+            # Auto-create if missing
+            row = {"guild_id": str(guild_id), "channel_id": None, "count": 0, "last_user": None}
+            await repository.insert("counting", {**row, "leaderboard": {}})
+        # setdefault: a concurrent load for the same guild must share one state dict
+        return self.cache.setdefault(str(guild_id), row)
 
     async def update_count_data(self, guild_id: int, data: dict):
-        """Update counting table in Supabase."""
-        supabase.table("counting").update(data).eq("guild_id", str(guild_id)).execute()
+        """Apply a change to the cached state and persist it right away."""
+        state = await self.get_count_data(guild_id)
+        state.update(data)
+        self.pending_states.add(str(guild_id), dict(state))
+        await self.pending_states.flush()
+
+    def advance(self, guild_id: str, state: dict, user_id: str, number: int) -> bool:
+        """
+        Validate one number against the guild's in-memory count.
+
+        Never awaits, so messages are applied one at a time in the order the
+        gateway delivered them; the database write is queued, not waited on.
+        """
+        accepted = user_id != str(state.get("last_user")) and number == (state.get("count") or 0) + 1
+        if accepted:
+            state.update(count=number, last_user=user_id)
+            self.pending_scores.add((guild_id, user_id), 1)
+        else:
+            state.update(count=0, last_user=None)
+        self.pending_states.add(guild_id, dict(state))
+        return accepted
 
     # ------------------- Slash Commands -------------------
     @app_commands.command(name="setcountingchannel", description="Set or update this server’s counting channel.")
@@ -72,20 +162,23 @@ class Counting(commands.Cog):
 
     @app_commands.command(name="leaderboard", description="View the counting leaderboard for this server.")
     async def leaderboard(self, interaction: discord.Interaction):
-        data = await self.get_count_data(interaction.guild.id)
-        leaderboard = data.get("leaderboard", {}) or {}
+        await self.pending_scores.flush()  # include counts still waiting in the buffer
+        # Served by the (guild_id, score DESC) index on counting_scores
+        top = await repository.fetch(
+            "counting_scores", "user_id, score", order="score", desc=True, limit=10, guild_id=str(interaction.guild.id)
+        )
 
-        if not leaderboard:
+        if not top:
             return await interaction.response.send_message("📊 No leaderboard data yet. Start counting first!", ephemeral=True)
 
-        sorted_board = sorted(leaderboard.items(), key=lambda x: x[1], reverse=True)
         embed = discord.Embed(
             title="🏆 Counting Leaderboard",
             color=discord.Color.gold(),
             timestamp=datetime.utcnow()
         )
         desc = ""
-        for i, (user_id, score) in enumerate(sorted_board[:10], start=1):
+        for i, row in enumerate(top, start=1):
+            user_id, score = row["user_id"], row["score"]
             user = interaction.guild.get_member(int(user_id))
             username = user.name if user else f"User {user_id}"
             desc += f"**#{i}** {username} — `{score}` counts\n"
@@ -100,39 +193,26 @@ class Counting(commands.Cog):
             return
 
         guild_id = str(message.guild.id)
-        data = await self.get_count_data(message.guild.id)
+        data = self.cache.get(guild_id)
+        if data is None:
+            if self.cache_warm:
+                return  # no row means no counting channel configured
+            data = await self.get_count_data(message.guild.id)
 
         channel_id = data.get("channel_id")
-        if not channel_id or int(channel_id) != message.channel.id:
+        if not channel_id or str(channel_id) != str(message.channel.id):
             return
 
-        current_count = data.get("count", 0)
-        last_user = data.get("last_user")
-
         try:
             number = int(message.content.strip())
         except ValueError:
             return
 
-        if str(message.author.id) == str(last_user):
-            await message.add_reaction("❌")
-            await message.channel.send(f"{message.author.mention} ruined it! Next number is **1**.")
-            await self.update_count_data(guild_id, {"count": 0, "last_user": None})
-            return
-
-        if number == current_count + 1:
+        if self.advance(guild_id, data, str(message.author.id), number):
             await message.add_reaction("✅")
-            new_leaderboard = data.get("leaderboard", {}) or {}
-            new_leaderboard[str(message.author.id)] = new_leaderboard.get(str(message.author.id), 0) + 1
-            await self.update_count_data(guild_id, {
-                "count": number,
-                "last_user": str(message.author.id),
-                "leaderboard": new_leaderboard
-            })
         else:
             await message.add_reaction("❌")
-            await message.channel.send(f"{message.author.mention} ruined it! Next number is **1**.")
-            await self.update_count_data(guild_id, {"count": 0, "last_user": None})
+            scheduler.enqueue(message.channel, priority=Priority.FUN, content=f"{message.author.mention} ruined it! Next number is **1**.")
 
 async def setup(bot):
     await bot.add_cog(Counting(bot))
\ No newline at end of file
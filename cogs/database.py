@@ -1,21 +1,11 @@
 # cogs/database.py
-import os
-from supabase import create_client, Client
+from supabase import Client
+from utils.supabase_client import supabase as _shared_client
 
 # ------------------- Supabase Connection -------------------
-def init_supabase() -> Client:
-    """Initialize and return a Supabase client connection."""
-    SUPABASE_URL = os.getenv("SUPABASE_URL")
-    SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-
-    if not SUPABASE_URL or not SUPABASE_KEY:
-        raise ValueError("❌ Missing SUPABASE_URL or SUPABASE_KEY in environment variables.")
-
-    client = create_client(SUPABASE_URL, SUPABASE_KEY)
-    print("✅ Connected to Supabase database.")
-    return client
-
-supabase: Client = init_supabase()
+# Every cog resolves the same pooled client from utils.supabase_client.
+supabase: Client = _shared_client
+print("✅ Connected to Supabase database.")
 
 # ------------------- Auto Table Initialization -------------------
 def ensure_base_tables():
@@ -92,5 +82,232 @@ def ensure_base_tables():
     else:
         print("✅ All Supabase tables verified.")
 
+# ------------------- Schema Updates -------------------
+# Idempotent additions made after first-time setup; applied on every start.
+schema_updates = {
+    "counting_scores": """
+        CREATE TABLE IF NOT EXISTS counting_scores (
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            score BIGINT NOT NULL DEFAULT 0,
+            PRIMARY KEY (guild_id, user_id)
+        );
+        CREATE INDEX IF NOT EXISTS counting_scores_top_idx
+            ON counting_scores (guild_id, score DESC);
+        -- Carry over scores from the old counting.leaderboard JSON blob
+        INSERT INTO counting_scores (guild_id, user_id, score)
+        SELECT c.guild_id, lb.key, lb.value::BIGINT
+        FROM counting c, json_each_text(COALESCE(c.leaderboard::json, '{}'::json)) AS lb
+        ON CONFLICT (guild_id, user_id) DO NOTHING;
+    """,
+    "images": """
+        CREATE TABLE IF NOT EXISTS images (
+            id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+            user_id TEXT,
+            server_id TEXT,
+            channel_id TEXT,
+            author TEXT,
+            url TEXT,
+            storage_path TEXT,
+            filename TEXT,
+            timestamp TEXT
+        );
+        ALTER TABLE images ADD COLUMN IF NOT EXISTS content_hash TEXT;
+        ALTER TABLE images ADD COLUMN IF NOT EXISTS attachment_id TEXT;
+        CREATE INDEX IF NOT EXISTS images_attachment_id_idx ON images (attachment_id);
+        CREATE INDEX IF NOT EXISTS images_user_id_id_idx ON images (user_id, id DESC);
+    """,
+    "image_jobs": """
+        -- Background /copy and /paste jobs, with a checkpoint to resume from
+        CREATE TABLE IF NOT EXISTS image_jobs (
+            id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+            kind TEXT NOT NULL,
+            status TEXT NOT NULL DEFAULT 'queued',
+            user_id TEXT NOT NULL,
+            guild_id TEXT NOT NULL,
+            channel_id TEXT NOT NULL,
+            message_id TEXT,
+            params JSONB NOT NULL DEFAULT '{}'::jsonb,
+            checkpoint JSONB NOT NULL DEFAULT '{}'::jsonb,
+            progress INT NOT NULL DEFAULT 0,
+            total INT NOT NULL DEFAULT 0,
+            error TEXT,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT now(),
+            updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        );
+        CREATE INDEX IF NOT EXISTS image_jobs_user_id_id_idx ON image_jobs (user_id, id DESC);
+        CREATE INDEX IF NOT EXISTS image_jobs_active_idx ON image_jobs (status) WHERE status IN ('queued', 'running');
+    """,
+    "image_blobs": """
+        -- One row per stored object in the content-addressed bucket
+        CREATE TABLE IF NOT EXISTS image_blobs (
+            content_hash TEXT PRIMARY KEY,
+            storage_path TEXT NOT NULL,
+            ref_count BIGINT NOT NULL DEFAULT 0
+        );
+        -- Last reference change or reuse; collection leaves recently touched blobs alone
+        ALTER TABLE image_blobs ADD COLUMN IF NOT EXISTS updated_at TIMESTAMPTZ NOT NULL DEFAULT now();
+        CREATE OR REPLACE FUNCTION images_track_blob_refs()
+        RETURNS TRIGGER
+        LANGUAGE plpgsql
+        AS $$
+        BEGIN
+            IF TG_OP = 'INSERT' AND NEW.content_hash IS NOT NULL THEN
+                INSERT INTO image_blobs (content_hash, storage_path, ref_count)
+                VALUES (NEW.content_hash, NEW.storage_path, 1)
+                ON CONFLICT (content_hash) DO UPDATE
+                SET ref_count = image_blobs.ref_count + 1, updated_at = now();
+            ELSIF TG_OP = 'DELETE' AND OLD.content_hash IS NOT NULL THEN
+                UPDATE image_blobs SET ref_count = ref_count - 1, updated_at = now()
+                WHERE content_hash = OLD.content_hash;
+            END IF;
+            RETURN NULL;
+        END;
+        $$;
+        DROP TRIGGER IF EXISTS images_blob_refs ON images;
+        CREATE TRIGGER images_blob_refs
+            AFTER INSERT OR DELETE ON images
+            FOR EACH ROW EXECUTE FUNCTION images_track_blob_refs();
+    """,
+    "joins": """
+        CREATE TABLE IF NOT EXISTS joins (
+            id BIGINT GENERATED ALWAYS AS IDENTITY PRIMARY KEY,
+            guild_id TEXT NOT NULL,
+            user_id TEXT NOT NULL,
+            username TEXT NOT NULL,
+            joined_at TEXT NOT NULL
+        );
+        -- joined_at is ISO-8601 text, so range filters sort correctly
+        CREATE INDEX IF NOT EXISTS joins_guild_joined_at_idx ON joins (guild_id, joined_at);
+    """,
+    "case_counters": """
+        -- Last case number handed out per guild
+        CREATE TABLE IF NOT EXISTS case_counters (
+            guild_id TEXT PRIMARY KEY,
+            last_case_id BIGINT NOT NULL DEFAULT 0
+        );
+        -- Continue after any existing (formerly random) case ids
+        INSERT INTO case_counters (guild_id, last_case_id)
+        SELECT guild_id, MAX(case_id) FROM cases GROUP BY guild_id
+        ON CONFLICT (guild_id) DO UPDATE
+        SET last_case_id = GREATEST(case_counters.last_case_id, EXCLUDED.last_case_id);
+        CREATE INDEX IF NOT EXISTS cases_guild_user_case_idx ON cases (guild_id, user_id, case_id DESC);
+    """,
+}
+
+def ensure_schema_updates():
+    """Apply idempotent schema additions (new tables and indexes)."""
+    for name, ddl in schema_updates.items():
+        try:
+            supabase.postgrest.rpc("exec", {"sql": ddl}).execute()
+            print(f"✅ Schema ready: {name}")
+        except Exception as e:
+            print(f"⚠️ Failed applying schema {name}: {e}")
+
+# ------------------- Server-Side Functions -------------------
+functions = {
+    "increment_message_counts": """
+        DROP FUNCTION IF EXISTS increment_message_counts(JSONB);
+        CREATE FUNCTION increment_message_counts(deltas JSONB)
+        RETURNS SETOF message_counter
+        LANGUAGE sql
+        AS $$
+            INSERT INTO message_counter (guild_id, user_id, count, last_updated)
+            SELECT d->>'guild_id', d->>'user_id', (d->>'delta')::BIGINT, d->>'last_updated'
+            FROM jsonb_array_elements(deltas) AS d
+            ON CONFLICT (guild_id, user_id) DO UPDATE
+            SET count = message_counter.count + EXCLUDED.count,
+                last_updated = EXCLUDED.last_updated
+            RETURNING *;
+        $$;
+    """,
+    "increment_counting_scores": """
+        CREATE OR REPLACE FUNCTION increment_counting_scores(deltas JSONB)
+        RETURNS VOID
+        LANGUAGE sql
+        AS $$
+            INSERT INTO counting_scores (guild_id, user_id, score)
+            SELECT d->>'guild_id', d->>'user_id', (d->>'delta')::BIGINT
+            FROM jsonb_array_elements(deltas) AS d
+            ON CONFLICT (guild_id, user_id) DO UPDATE
+            SET score = counting_scores.score + EXCLUDED.score;
+        $$;
+    """,
+    "increment_balance": """
+        CREATE OR REPLACE FUNCTION increment_balance(p_guild_id TEXT, p_user_id TEXT, p_delta BIGINT DEFAULT 0)
+        RETURNS BIGINT
+        LANGUAGE sql
+        AS $$
+            INSERT INTO economy (guild_id, user_id, balance)
+            VALUES (p_guild_id, p_user_id, p_delta)
+            ON CONFLICT (guild_id, user_id) DO UPDATE
+            SET balance = COALESCE(economy.balance, 0) + EXCLUDED.balance
+            RETURNING balance;
+        $$;
+    """,
+    "collect_image_blobs": """
+        CREATE OR REPLACE FUNCTION collect_image_blobs()
+        RETURNS SETOF image_blobs
+        LANGUAGE sql
+        AS $$
+            DELETE FROM image_blobs
+            WHERE ref_count <= 0 AND updated_at < now() - interval '1 hour'
+            RETURNING *;
+        $$;
+    """,
+    "pin_image_blob": """
+        -- Record a blob (unreferenced if new) and stamp it, so collection leaves it
+        -- alone while the copy uploads it and writes the images row referencing it.
+        -- Returns whether the blob is live, i.e. its object needs no upload.
+        DROP FUNCTION IF EXISTS pin_image_blob(TEXT);
+        CREATE OR REPLACE FUNCTION pin_image_blob(p_content_hash TEXT, p_storage_path TEXT)
+        RETURNS BOOLEAN
+        LANGUAGE sql
+        AS $$
+            INSERT INTO image_blobs (content_hash, storage_path, ref_count, updated_at)
+            VALUES (p_content_hash, p_storage_path, 0, now())
+            ON CONFLICT (content_hash) DO UPDATE SET updated_at = now()
+            RETURNING ref_count > 0;
+        $$;
+    """,
+    "insert_cases": """
+        -- Allocate consecutive case ids and insert the cases in one statement
+        CREATE OR REPLACE FUNCTION insert_cases(p_guild_id TEXT, p_cases JSONB)
+        RETURNS SETOF cases
+        LANGUAGE sql
+        AS $$
+            WITH counter AS (
+                INSERT INTO case_counters (guild_id, last_case_id)
+                VALUES (p_guild_id, jsonb_array_length(p_cases))
+                ON CONFLICT (guild_id) DO UPDATE
+                SET last_case_id = case_counters.last_case_id + jsonb_array_length(p_cases)
+                RETURNING last_case_id
+            )
+            INSERT INTO cases (guild_id, case_id, case_type, user_id, moderator_id, reason, timestamp)
+            SELECT p_guild_id,
+                   counter.last_case_id - jsonb_array_length(p_cases) + c.ordinality,
+                   c.value->>'case_type',
+                   c.value->>'user_id',
+                   c.value->>'moderator_id',
+                   c.value->>'reason',
+                   c.value->>'timestamp'
+            FROM counter, jsonb_array_elements(p_cases) WITH ORDINALITY AS c
+            ORDER BY c.ordinality
+            RETURNING *;
+        $$;
+    """,
+}
+
+def ensure_functions():
+    """Create or refresh the Postgres functions the cogs call through RPC."""
+    for name, ddl in functions.items():
+        try:
+            supabase.postgrest.rpc("exec", {"sql": ddl}).execute()
+            print(f"✅ Function ready: {name}")
+        except Exception as e:
+            print(f"⚠️ Failed creating function {name}: {e}")
+
 # Run verification automatically
-ensure_base_tables()
\ No newline at end of file
+ensure_base_tables()
+ensure_schema_updates()
+ensure_functions()
\ No newline at end of file
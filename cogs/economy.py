@@ -2,61 +2,56 @@ import discord
 from discord import app_commands
 from discord.ext import commands
 from utils.embeds import elura_embed
-from cogs.database import supabase  # ✅ Shared Supabase client (no proxy issue)
+from utils import repository  # ✅ Async access to the shared Supabase client
+from utils.cache import TTLCache
+from utils.leaderboard import TopNCache
 import random
 
+# ------------------- Balance Cache -------------------
+BALANCE_CACHE_SIZE = 10_000  # (guild, user) entries kept in memory
+BALANCE_CACHE_TTL = 300.0  # seconds before a cached balance is re-read
+
 
 class Economy(commands.Cog):
     """Economy system — earn and manage virtual credits."""
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.ensure_table()
+        # (guild_id, user_id) -> balance, written through on every change
+        self.balances = TTLCache(maxsize=BALANCE_CACHE_SIZE, ttl=BALANCE_CACHE_TTL)
+        self.top = TopNCache(size=10)
+
+    def cache_stats(self) -> dict:
+        return {"Balances": self.balances.stats(), "Richest": self.top.stats()}
+
+    async def cog_load(self):
+        await self.ensure_table()
 
-    def ensure_table(self):
+    async def ensure_table(self):
         """Ensure the economy table exists."""
         try:
-            test = supabase.table("economy").select("id").limit(1).execute()
-            if test.data is not None:
-                print("✅ Economy table verified.")
+            await repository.fetch("economy", "id", limit=1)
+            print("✅ Economy table verified.")
         except Exception as e:
             print(f"⚠️ Could not verify economy table: {e}")
 
     async def fetch_balance(self, guild_id: int, user_id: int) -> int:
-        """Fetch or initialize a user's balance."""
-        result = supabase.table("economy") \
-            .select("*") \
-            .eq("guild_id", str(guild_id)) \
-            .eq("user_id", str(user_id)) \
-            .execute()
-        data = result.data
-        if not data:
-            supabase.table("economy").insert({
-                "guild_id": str(guild_id),
-                "user_id": str(user_id),
-                "balance": 0
-            }).execute()
-            return 0
-        return data[0]["balance"]
+        """Fetch or initialize a user's balance, answering from cache when possible."""
+        cached = self.balances.get((str(guild_id), str(user_id)))
+        if cached is not None:
+            return cached
+        return await self.update_balance(guild_id, user_id, 0)
 
-    async def update_balance(self, guild_id: int, user_id: int, new_balance: int):
-        """Update or insert balance safely."""
-        result = supabase.table("economy") \
-            .select("*") \
-            .eq("guild_id", str(guild_id)) \
-            .eq("user_id", str(user_id)) \
-            .execute()
-        if result.data:
-            supabase.table("economy").update({"balance": new_balance}) \
-                .eq("guild_id", str(guild_id)) \
-                .eq("user_id", str(user_id)) \
-                .execute()
-        else:
-            supabase.table("economy").insert({
-                "guild_id": str(guild_id),
-                "user_id": str(user_id),
-                "balance": new_balance
-            }).execute()
+    async def update_balance(self, guild_id: int, user_id: int, delta: int) -> int:
+        """Atomically add ``delta`` to a balance, creating the row if needed, and return the new balance."""
+        balance = await repository.increment("increment_balance", {
+            "p_guild_id": str(guild_id),
+            "p_user_id": str(user_id),
+            "p_delta": delta
+        })
+        self.balances.set((str(guild_id), str(user_id)), balance)
+        self.top.update(str(guild_id), str(user_id), balance)
+        return balance
 
     @app_commands.command(name="balance", description="Check your current balance.")
     async def balance(self, interaction: discord.Interaction):
@@ -70,10 +65,8 @@ class Economy(commands.Cog):
     @app_commands.command(name="work", description="Work to earn credits (1h cooldown).")
     @app_commands.checks.cooldown(1, 3600.0, key=lambda i: i.user.id)
     async def work(self, interaction: discord.Interaction):
-        balance = await self.fetch_balance(interaction.guild.id, interaction.user.id)
         earned = random.randint(100, 300)
-        new_balance = balance + earned
-        await self.update_balance(interaction.guild.id, interaction.user.id, new_balance)
+        new_balance = await self.update_balance(interaction.guild.id, interaction.user.id, earned)
         embed = elura_embed(
             "🧰 Work Complete",
             f"You worked hard and earned **{earned} credits!**\nNew balance: **{new_balance:,}**"
@@ -82,19 +75,19 @@ class Economy(commands.Cog):
 
     @app_commands.command(name="leaderboard", description="Show the richest members in this server.")
     async def leaderboard(self, interaction: discord.Interaction):
-        result = supabase.table("economy") \
-            .select("*") \
-            .eq("guild_id", str(interaction.guild.id)) \
-            .order("balance", desc=True) \
-            .limit(10) \
-            .execute()
-
-        data = result.data
-        if not data:
+        guild_id = str(interaction.guild.id)
+        top = self.top.get(guild_id)
+        if top is None:
+            rows = await repository.fetch(
+                "economy", "user_id, balance", order="balance", desc=True, limit=self.top.capacity, guild_id=guild_id
+            )
+            self.top.load(guild_id, ((r["user_id"], r["balance"]) for r in rows))
+            top = self.top.get(guild_id)
+        if not top:
             return await interaction.response.send_message("No economy data found yet.", ephemeral=True)
 
         desc = "\n".join(
-            [f"**{i+1}.** <@{r['user_id']}> — **{r['balance']:,} credits**" for i, r in enumerate(data)]
+            [f"**{i+1}.** <@{user_id}> — **{balance:,} credits**" for i, (user_id, balance) in enumerate(top)]
         )
         embed = elura_embed("🏆 Server Leaderboard", desc)
         await interaction.response.send_message(embed=embed)
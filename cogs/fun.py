@@ -1,9 +1,8 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from utils.supabase_client import supabase  # shared Supabase connection
+from utils import repository  # async access to the shared Supabase connection
 import random
-from cogs.database import supabase
 
 class Fun(commands.Cog):
     """Fun & interactive commands for entertainment."""
@@ -49,11 +48,11 @@ class Fun(commands.Cog):
         try:
             # Example of making a Supabase or API call if you store memes in DB
             # This line just shows how you could use Supabase safely
-            result = supabase.table("memes").select("*").limit(1).execute()
+            rows = await repository.fetch("memes", limit=1)
 
             meme_url = (
-                result.data[0]["url"]
-                if result.data and "url" in result.data[0]
+                rows[0]["url"]
+                if rows and "url" in rows[0]
                 else "https://i.imgur.com/YOj9L9D.png"
             )
 
@@ -1,7 +1,8 @@
 # cogs/imagesync.py
 """
 Elura Utility — ImageSync Cog
-- Provides /copy, /paste, /listimages, /clearimages
+- Provides /copy, /paste, /listimages, /clearimages, /status, /cancel
+- /copy and /paste run as resumable background jobs with a live progress embed
 - Auto-creates Supabase storage bucket 'elura-images' and table 'images' (best effort)
 - Works without proxy; fully async-safe
 """
@@ -13,14 +14,33 @@ import aiohttp
 import io
 import os
 import asyncio
-from datetime import datetime
-from utils.supabase_client import supabase, SUPABASE_URL, SUPABASE_KEY
-from cogs.database import supabase
+from collections import deque
+from typing import Optional
+from utils.supabase_client import SUPABASE_URL, SUPABASE_KEY
+from utils import repository, storage_stream
+from utils.jobs import JobQueue
+from utils.send_scheduler import scheduler
+from utils.cache import MISSING, TTLCache
+from utils.pagination import KeysetView
 
 # ------------------- Configuration -------------------
 BUCKET_NAME = "elura-images"
 TABLE_NAME = "images"
+JOBS_TABLE = "image_jobs"
 MAX_COPY = 20
+COPY_WORKERS = 5  # concurrent download/upload transfers per /copy
+COPY_CHUNK = 10  # attachments stored between checkpoints
+PASTE_CHUNK = 20  # records pasted between checkpoints
+JOB_WORKERS = 4  # jobs running at once across all guilds
+JOBS_PER_GUILD = 1  # jobs running at once in one guild
+PROGRESS_INTERVAL = 2.0  # seconds between progress embed edits
+PASTE_DOWNLOADS = 5  # concurrent storage downloads for /paste
+PASTE_PREFETCH_WINDOW = 20  # images fetched ahead of the one being sent
+MAX_FILES_PER_MESSAGE = 10  # Discord's attachment limit per message
+LIST_PAGE_SIZE = 8
+LIST_PAGES_PER_USER = 10  # recently viewed pages kept per user
+LIST_CACHE_USERS = 500
+LIST_CACHE_TTL = 120.0
 ADMIN_ROLE_ID = 1431189241685344348  # adjust if needed
 
 # Colors
@@ -38,6 +58,8 @@ CREATE TABLE IF NOT EXISTS {TABLE_NAME} (
   author TEXT,
   url TEXT,
   storage_path TEXT,
+  content_hash TEXT,
+  attachment_id TEXT,
   filename TEXT,
   timestamp TEXT
 );
@@ -49,11 +71,36 @@ class ImageSync(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.session = aiohttp.ClientSession()
+        self._prefetch_slots = asyncio.Semaphore(PASTE_DOWNLOADS)
+        self.pages = TTLCache(maxsize=LIST_CACHE_USERS, ttl=LIST_CACHE_TTL)  # user_id -> {cursor: page}
+        self.jobs = JobQueue(
+            JOBS_TABLE,
+            {"copy": self._run_copy, "paste": self._run_paste},
+            on_progress=self._report_job,
+            workers=JOB_WORKERS,
+            per_guild=JOBS_PER_GUILD,
+            progress_interval=PROGRESS_INTERVAL,
+            name="imagesync",
+        )
         bot.loop.create_task(self._ensure_supabase_setup())
 
-    def cog_unload(self):
-        """Ensure aiohttp session closes properly."""
-        self.bot.loop.create_task(self.session.close())
+    def cache_stats(self) -> dict:
+        return {"Image list pages": self.pages.stats()}
+
+    async def cog_load(self):
+        asyncio.create_task(self._resume_jobs())
+
+    async def cog_unload(self):
+        """Park running jobs for the next start, then close the aiohttp session."""
+        await self.jobs.close()
+        await self.session.close()
+
+    async def _resume_jobs(self):
+        await self.bot.wait_until_ready()
+        try:
+            await self.jobs.resume()
+        except Exception as e:
+            print(f"[imagesync] Could not resume jobs: {e}")
 
     # ------------------- Supabase Setup -------------------
     async def _ensure_supabase_setup(self):
@@ -62,10 +109,9 @@ class ImageSync(commands.Cog):
 
         # 1. Ensure bucket exists
         try:
-            buckets = supabase.storage.list_buckets()
-            names = [b["name"] for b in buckets]
+            names = await repository.list_buckets()
             if BUCKET_NAME not in names:
-                supabase.storage.create_bucket(BUCKET_NAME, public=False)
+                await repository.create_bucket(BUCKET_NAME, public=False)
                 print(f"✅ Created storage bucket '{BUCKET_NAME}'.")
             else:
                 print(f"✅ Bucket '{BUCKET_NAME}' already exists.")
@@ -74,7 +120,7 @@ class ImageSync(commands.Cog):
 
         # 2. Ensure table exists
         try:
-            supabase.table(TABLE_NAME).select("*").limit(1).execute()
+            await repository.fetch(TABLE_NAME, limit=1)
             print(f"✅ Supabase table '{TABLE_NAME}' is accessible.")
         except Exception as e:
             print(f"⚠️ Table check failed: {e}")
@@ -98,118 +144,388 @@ class ImageSync(commands.Cog):
             print(f"[imagesync] SQL create failed: {e}")
 
     # ------------------- Utility Helpers -------------------
-    async def _download_bytes(self, url: str) -> bytes:
-        """Download bytes from a URL safely."""
-        try:
-            async with self.session.get(url) as resp:
-                if resp.status == 200:
-                    return await resp.read()
-        except Exception as e:
-            print(f"[imagesync] Download failed for {url}: {e}")
-        return b""
-
-    def _storage_path(self, user_id: str, filename: str) -> str:
-        ts = datetime.utcnow().strftime("%Y%m%dT%H%M%SZ")
-        return f"{user_id}/{ts}_{filename.replace(' ', '_')}"
+    def _storage_path(self, content_hash: str) -> str:
+        """Content-addressed key: identical bytes always map to the same object."""
+        return f"sha256/{content_hash[:2]}/{content_hash}"
 
     def _is_admin(self, member: discord.Member) -> bool:
         return any(role.id == ADMIN_ROLE_ID for role in member.roles)
 
-    # ------------------- Commands -------------------
-    @app_commands.command(name="copy", description="Copy recent image attachments to your library.")
-    async def copy(self, interaction: discord.Interaction):
-        await interaction.response.defer(ephemeral=True)
-        copied, errors = 0, 0
-        examples = []
+    async def _prefetch(self, rec: dict):
+        """Download one stored image into a spooled file; returns (file, size) or None."""
+        async with self._prefetch_slots:
+            try:
+                spool = await storage_stream.download(self.session, BUCKET_NAME, rec["storage_path"])
+            except Exception as e:
+                print(f"[imagesync] Prefetch failed for {rec.get('filename')}: {e}")
+                return None
+        size = spool.seek(0, io.SEEK_END)
+        spool.seek(0)
+        return spool, size
+
+    async def _paste_records(self, channel: discord.abc.Messageable, records: list, size_cap: int) -> int:
+        """
+        Send ``records`` in order, packing as many files per message as
+        Discord allows while later downloads run ahead in the background.
+        The send scheduler paces the messages within the channel's rate limit.
+        """
+        window = deque()  # (record, prefetch task), in send order
+        upcoming = iter(records)
+
+        def refill():
+            while len(window) < PASTE_PREFETCH_WINDOW:
+                rec = next(upcoming, None)
+                if rec is None:
+                    return
+                window.append((rec, asyncio.create_task(self._prefetch(rec))))
+
+        async def flush(batch):
+            files = [discord.File(spool, filename=rec["filename"]) for rec, spool, _ in batch]
+            try:
+                await scheduler.enqueue(channel, files=files)
+                return len(batch)
+            except Exception as e:
+                print(f"[imagesync] Paste failed for {len(batch)} file(s): {e}")
+                return 0
+            finally:
+                # discord.File stubs out close() until it is closed itself, even if never sent.
+                for file in files:
+                    file.close()
+                for _, spool, _ in batch:
+                    spool.close()
 
-        async for msg in interaction.channel.history(limit=200):
-            if copied >= MAX_COPY:
-                break
+        sent, batch, batch_bytes = 0, [], 0
+        refill()
+        try:
+            while window:
+                rec, task = window.popleft()
+                refill()
+                fetched = await task
+                if fetched is None:
+                    continue
+                spool, size = fetched
+                if size > size_cap:
+                    print(f"[imagesync] Skipping {rec['filename']}: larger than this server's upload limit")
+                    spool.close()
+                    continue
+                if batch and (len(batch) >= MAX_FILES_PER_MESSAGE or batch_bytes + size > size_cap):
+                    sent += await flush(batch)
+                    batch, batch_bytes = [], 0
+                batch.append((rec, spool, size))
+                batch_bytes += size
+            if batch:
+                sent += await flush(batch)
+        finally:
+            for _, spool, _ in batch:
+                spool.close()
+            for _, task in window:
+                if not task.done():
+                    task.cancel()
+                elif not task.cancelled() and task.result():
+                    task.result()[0].close()
+        return sent
+
+    async def _pin_blob(self, content_hash: str, storage_path: str) -> bool:
+        """Protect a blob from collection for the next hour; True if its object is already live."""
+        return bool(await repository.rpc("pin_image_blob", {"p_content_hash": content_hash, "p_storage_path": storage_path}))
+
+    async def _store_content(self, item: dict):
+        """
+        Return (content_hash, storage_path) for an attachment, uploading only bytes the bucket lacks.
+        The blob is pinned first, so a concurrent /clearimages can't collect it
+        before this copy's images row references it, and an upload whose row
+        is never written is still recorded for collection.
+        """
+        # Copied before: reuse the known hash without downloading again.
+        known = await repository.execute(
+            repository.table(TABLE_NAME).select("content_hash, storage_path")
+            .eq("attachment_id", item["id"]).not_.is_("content_hash", "null").limit(1)
+        )
+        if known and await self._pin_blob(known[0]["content_hash"], known[0]["storage_path"]):
+            return known[0]["content_hash"], known[0]["storage_path"]
+
+        spool, size, content_hash = await storage_stream.fetch(self.session, item["url"])
+        with spool:
+            storage_path = self._storage_path(content_hash)
+            if not await self._pin_blob(content_hash, storage_path):
+                await storage_stream.upload(
+                    self.session, BUCKET_NAME, storage_path, storage_stream.iter_file(spool),
+                    size, item["content_type"], exist_ok=True
+                )
+        return content_hash, storage_path
+
+    async def _load_page(self, user_id: str, cursor):
+        """
+        One page of a user's images older than ``cursor`` (newest first),
+        served by the (user_id, id DESC) index. Returns (rows, next_cursor).
+        """
+        pages = self.pages.get(user_id)
+        if pages is None:
+            pages = {}
+            self.pages.set(user_id, pages)
+        elif cursor in pages:
+            return pages[cursor]
+
+        query = repository.table(TABLE_NAME).select("id, filename, author, timestamp").eq("user_id", user_id)
+        if cursor is not None:
+            query = query.lt("id", cursor)
+        # One extra row tells us whether a next page exists.
+        rows = await repository.execute(query.order("id", desc=True).limit(LIST_PAGE_SIZE + 1))
+        next_cursor = rows[LIST_PAGE_SIZE - 1]["id"] if len(rows) > LIST_PAGE_SIZE else None
+        page = (rows[:LIST_PAGE_SIZE], next_cursor)
+
+        if len(pages) >= LIST_PAGES_PER_USER:
+            pages.pop(next(iter(pages)))
+        pages[cursor] = page
+        return page
+
+    async def _page_start(self, user_id: str, page: int):
+        """
+        The cursor that starts ``page`` (1-based): one offset lookup of that
+        page's newest id. Returns MISSING if the user has fewer pages.
+        """
+        if page <= 1:
+            return None
+        offset = (page - 1) * LIST_PAGE_SIZE
+        rows = await repository.execute(
+            repository.table(TABLE_NAME).select("id").eq("user_id", user_id)
+            .order("id", desc=True).range(offset, offset)
+        )
+        return rows[0]["id"] + 1 if rows else MISSING
+
+    def _list_embed(self, rows: list, page: int) -> discord.Embed:
+        embed = discord.Embed(title=f"📚 Your Images — Page {page}", color=BLURPLE)
+        for rec in rows:
+            embed.add_field(name=rec.get("filename", "image"), value=f"From {rec.get('author', 'unknown')} • {rec.get('timestamp', '')}", inline=False)
+        embed.set_footer(text="Use the buttons to browse your library.")
+        return embed
+
+    async def _copy_one(self, job_row: dict, item: dict):
+        """Store one attachment (deduplicated by content); returns its metadata row or None."""
+        if item["size"] > storage_stream.MAX_FILE_BYTES:
+            print(f"[imagesync] Skipping {item['filename']}: {item['size']} bytes is over the size limit")
+            return None
+        try:
+            content_hash, storage_path = await self._store_content(item)
+        except Exception as e:
+            print(f"[imagesync] Transfer failed for {item['filename']}: {e}")
+            return None
+        return {
+            "user_id": job_row["user_id"],
+            "server_id": job_row["guild_id"],
+            "channel_id": job_row["channel_id"],
+            "author": item["author"],
+            "url": item["url"],
+            "storage_path": storage_path,
+            "content_hash": content_hash,
+            "attachment_id": item["id"],
+            "filename": item["filename"],
+            "timestamp": item["created_at"]
+        }
+
+    async def _scan_attachments(self, channel: discord.abc.Messageable) -> list:
+        """The newest image attachments in ``channel``, as plain dicts a checkpoint can hold."""
+        items = []
+        async for msg in channel.history(limit=200):
             for att in msg.attachments:
                 if att.content_type and att.content_type.startswith("image/"):
-                    data = await self._download_bytes(att.url)
-                    storage_path = self._storage_path(str(interaction.user.id), att.filename)
-                    try:
-                        supabase.storage.from_(BUCKET_NAME).upload(storage_path, data)
-                        supabase.table(TABLE_NAME).insert({
-                            "user_id": str(interaction.user.id),
-                            "server_id": str(interaction.guild.id),
-                            "channel_id": str(interaction.channel.id),
-                            "author": str(msg.author),
-                            "url": att.url,
-                            "storage_path": storage_path,
-                            "filename": att.filename,
-                            "timestamp": msg.created_at.isoformat()
-                        }).execute()
-                        copied += 1
-                        examples.append(att.filename)
-                        if copied >= MAX_COPY:
-                            break
-                    except Exception as e:
-                        print(f"[imagesync] Copy failed: {e}")
-                        errors += 1
-
-        embed = discord.Embed(
-            title="📥 Copy Complete",
-            description=f"Stored **{copied}** image(s) to your library.",
-            color=BLURPLE
-        )
-        if examples:
-            embed.add_field(name="Examples", value=", ".join(examples[:6]), inline=False)
-        if errors:
-            embed.add_field(name="Errors", value=f"{errors} image(s) failed.", inline=False)
+                    items.append({
+                        "id": str(att.id),
+                        "url": att.url,
+                        "filename": att.filename,
+                        "content_type": att.content_type,
+                        "size": att.size,
+                        "author": str(msg.author),
+                        "created_at": msg.created_at.isoformat(),
+                    })
+                    if len(items) >= MAX_COPY:
+                        return items
+        return items
+
+    # ------------------- Background Jobs -------------------
+    async def _job_channel(self, job):
+        channel_id = int(job.row["channel_id"])
+        return self.bot.get_channel(channel_id) or await self.bot.fetch_channel(channel_id)
+
+    async def _run_copy(self, job):
+        channel = await self._job_channel(job)
+        checkpoint = job.checkpoint
+        if "items" not in checkpoint:
+            items = await self._scan_attachments(channel)
+            checkpoint = {"items": items, "done": 0, "copied": 0}
+            await job.save(total=len(items), checkpoint=checkpoint)
+
+        items, done, copied = checkpoint["items"], checkpoint["done"], checkpoint["copied"]
+        slots = asyncio.Semaphore(COPY_WORKERS)
+
+        async def transfer(item):
+            async with slots:
+                return await self._copy_one(job.row, item)
+
+        while done < len(items):
+            job.raise_if_cancelled()
+            chunk = items[done:done + COPY_CHUNK]
+            # Newest-first, same order the sequential copy used to insert in.
+            rows = [row for row in await asyncio.gather(*map(transfer, chunk)) if row]
+            await repository.insert_many(TABLE_NAME, rows)
+            if rows:
+                self.pages.pop(job.row["user_id"])
+            done += len(chunk)
+            copied += len(rows)
+            await job.save(progress=done, checkpoint={**checkpoint, "done": done, "copied": copied})
+
+    async def _run_paste(self, job):
+        channel = await self._job_channel(job)
+        checkpoint = job.checkpoint
+        if "record_ids" not in checkpoint:
+            records = await repository.fetch(
+                TABLE_NAME, "id", order="id", desc=True, limit=job.params.get("limit", 10), user_id=job.row["user_id"]
+            )
+            checkpoint = {"record_ids": [rec["id"] for rec in records], "done": 0, "sent": 0}
+            await job.save(total=len(records), checkpoint=checkpoint)
+
+        ids, done, sent = checkpoint["record_ids"], checkpoint["done"], checkpoint["sent"]
+        while done < len(ids):
+            job.raise_if_cancelled()
+            chunk = ids[done:done + PASTE_CHUNK]
+            rows = await repository.execute(
+                repository.table(TABLE_NAME).select("id, filename, storage_path").in_("id", chunk)
+            )
+            by_id = {row["id"]: row for row in rows}
+            sent += await self._paste_records(channel, [by_id[i] for i in chunk if i in by_id], channel.guild.filesize_limit)
+            done += len(chunk)
+            await job.save(progress=done, checkpoint={**checkpoint, "done": done, "sent": sent})
+
+    def _job_embed(self, row: dict) -> discord.Embed:
+        kind, status = row["kind"], row["status"]
+        progress, total = row.get("progress") or 0, row.get("total") or 0
+        checkpoint = row.get("checkpoint") or {}
+        title = f"{'📥 Copy' if kind == 'copy' else '📤 Paste'} — Job #{row['id']}"
+
+        if status == "queued":
+            description, color = "⏳ Waiting for a free worker...", BLURPLE
+        elif status == "running":
+            filled = round(10 * progress / total) if total else 0
+            description = f"`{'█' * filled}{'░' * (10 - filled)}` {progress}/{total}"
+            color = BLURPLE
+        elif status == "done" and kind == "copy":
+            description, color = f"✅ Stored **{checkpoint.get('copied', 0)}** image(s) to your library.", GOLD
+        elif status == "done":
+            description, color = f"✅ Pasted {checkpoint.get('sent', 0)}/{total} image(s).", GOLD
+        elif status == "cancelled":
+            description, color = f"🛑 Cancelled after {progress}/{total}.", ERROR
+        else:
+            description, color = "⚠️ The job failed. Try again later.", ERROR
+
+        embed = discord.Embed(title=title, description=description, color=color)
+        if kind == "copy" and status == "done" and progress - checkpoint.get("copied", 0) > 0:
+            embed.add_field(name="Errors", value=f"{progress - checkpoint.get('copied', 0)} image(s) failed.", inline=False)
         embed.set_footer(text="Elura • Image Sync")
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        return embed
+
+    async def _report_job(self, job):
+        """Edit the job's progress message (called at most every PROGRESS_INTERVAL seconds)."""
+        if not job.row.get("message_id"):
+            return
+        channel = await self._job_channel(job)
+        await channel.get_partial_message(int(job.row["message_id"])).edit(embed=self._job_embed(job.row))
+
+    async def _start_job(self, interaction: discord.Interaction, kind: str, params: Optional[dict] = None):
+        await interaction.response.defer(ephemeral=True)
+        try:
+            # The progress message lives in the channel so it can still be edited after a restart.
+            message = await interaction.channel.send(embed=discord.Embed(
+                title=f"{'📥 Copy' if kind == 'copy' else '📤 Paste'}", description="⏳ Queued...", color=BLURPLE
+            ))
+            row = await self.jobs.submit(
+                kind,
+                user_id=str(interaction.user.id),
+                guild_id=str(interaction.guild.id),
+                channel_id=str(interaction.channel.id),
+                params=params,
+                message_id=str(message.id),
+            )
+        except Exception as e:
+            print(f"[imagesync] Could not start {kind} job: {e}")
+            return await interaction.followup.send("⚠️ Could not start the job.", ephemeral=True)
+        await interaction.followup.send(
+            f"🚀 Started job **#{row['id']}**. Use `/status` to check on it or `/cancel` to stop it.", ephemeral=True
+        )
+
+    # ------------------- Commands -------------------
+    @app_commands.command(name="copy", description="Copy recent image attachments to your library.")
+    async def copy(self, interaction: discord.Interaction):
+        await self._start_job(interaction, "copy")
 
     @app_commands.command(name="paste", description="Paste your saved images here.")
     async def paste(self, interaction: discord.Interaction, limit: int = 10):
-        await interaction.response.defer(ephemeral=True)
-        user_id = str(interaction.user.id)
+        await self._start_job(interaction, "paste", {"limit": limit})
 
+    @app_commands.command(name="status", description="Show your image jobs and how many images you have stored.")
+    async def status(self, interaction: discord.Interaction):
+        user_id = str(interaction.user.id)
         try:
-            data = supabase.table(TABLE_NAME).select("*").eq("user_id", user_id).order("id", desc=True).limit(limit).execute()
+            stored = await repository.count(TABLE_NAME, user_id=user_id)
+            jobs = await repository.fetch(
+                JOBS_TABLE, "id, kind, status, progress, total", order="id", desc=True, limit=5, user_id=user_id
+            )
         except Exception as e:
-            print(f"[imagesync] Fetch failed: {e}")
-            return await interaction.followup.send("⚠️ Could not fetch your images.", ephemeral=True)
+            print(f"[imagesync] Status failed: {e}")
+            return await interaction.response.send_message("⚠️ Could not fetch your status.", ephemeral=True)
 
-        if not data.data:
-            return await interaction.followup.send("📭 No images found.", ephemeral=True)
+        embed = discord.Embed(title="📊 Image Sync Status", description=f"📚 **{stored:,}** image(s) stored.", color=BLURPLE)
+        if jobs:
+            embed.add_field(
+                name="Recent Jobs",
+                value="\n".join(f"**#{job['id']}** {job['kind']} • {job['status']} • {job['progress']}/{job['total']}" for job in jobs),
+                inline=False
+            )
+        embed.set_footer(text="Elura • Image Sync")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
 
-        sent = 0
-        for rec in data.data:
-            try:
-                file_bytes = supabase.storage.from_(BUCKET_NAME).download(rec["storage_path"])
-                if not isinstance(file_bytes, (bytes, bytearray)):
-                    file_bytes = getattr(file_bytes, "content", b"")
-                await interaction.channel.send(file=discord.File(io.BytesIO(file_bytes), filename=rec["filename"]))
-                sent += 1
-                await asyncio.sleep(0.6)
-            except Exception as e:
-                print(f"[imagesync] Paste failed: {e}")
-                continue
+    @app_commands.command(name="cancel", description="Cancel one of your running image jobs.")
+    async def cancel(self, interaction: discord.Interaction, job_id: Optional[int] = None):
+        user = interaction.user
+        try:
+            query = repository.table(JOBS_TABLE).select("id, user_id").in_("status", ["queued", "running"])
+            if job_id is None:
+                query = query.eq("user_id", str(user.id)).order("id", desc=True)
+            else:
+                query = query.eq("id", job_id)
+            jobs = await repository.execute(query.limit(1))
+        except Exception as e:
+            print(f"[imagesync] Cancel lookup failed: {e}")
+            return await interaction.response.send_message("⚠️ Could not look up the job.", ephemeral=True)
+
+        if not jobs:
+            return await interaction.response.send_message("📭 No active job to cancel.", ephemeral=True)
+        job = jobs[0]
+        if job["user_id"] != str(user.id) and not self._is_admin(user):
+            return await interaction.response.send_message("🚫 You can only cancel your own jobs.", ephemeral=True)
 
-        await interaction.followup.send(f"✅ Pasted {sent}/{len(data.data)} image(s).", ephemeral=True)
+        await self.jobs.cancel(job["id"])
+        await interaction.response.send_message(f"🛑 Cancelling job **#{job['id']}**...", ephemeral=True)
 
     @app_commands.command(name="listimages", description="List your stored images.")
     async def listimages(self, interaction: discord.Interaction, page: int = 1):
-        per_page = 8
-        offset = (page - 1) * per_page
+        await interaction.response.defer(ephemeral=True)
         user_id = str(interaction.user.id)
+        page = max(page, 1)
         try:
-            resp = supabase.table(TABLE_NAME).select("*").eq("user_id", user_id).order("id", desc=True).range(offset, offset + per_page - 1).execute()
+            # Jump straight to the requested page, then page by keyset from there.
+            start = await self._page_start(user_id, page)
+            items = []
+            if start is not MISSING:
+                view = KeysetView(lambda cursor: self._load_page(user_id, cursor), self._list_embed, start=start, first_page=page)
+                items = await view.load(0)
         except Exception as e:
             print(f"[imagesync] List failed: {e}")
-            return await interaction.response.send_message("⚠️ Error fetching images.", ephemeral=True)
+            return await interaction.followup.send("⚠️ Error fetching images.", ephemeral=True)
 
-        items = resp.data or []
         if not items:
-            return await interaction.response.send_message("📭 No images on this page.", ephemeral=True)
+            return await interaction.followup.send("📭 No images on this page.", ephemeral=True)
 
-        embed = discord.Embed(title=f"📚 Your Images — Page {page}", color=BLURPLE)
-        for rec in items:
-            embed.add_field(name=rec.get("filename", "image"), value=f"From {rec.get('author', 'unknown')} • {rec.get('timestamp', '')}", inline=False)
-        embed.set_footer(text="Use /listimages page:<n> for more pages.")
-        await interaction.response.send_message(embed=embed, ephemeral=True)
+        await interaction.followup.send(embed=view.embed(items), view=view, ephemeral=True)
 
     @app_commands.command(name="clearimages", description="Clear all your saved images (admin only).")
     async def clearimages(self, interaction: discord.Interaction):
@@ -218,11 +534,24 @@ class ImageSync(commands.Cog):
             return await interaction.response.send_message("🚫 You don't have permission.", ephemeral=True)
 
         try:
-            supabase.table(TABLE_NAME).delete().eq("user_id", str(user.id)).execute()
+            # Pre-dedup rows own their objects outright; note them before the rows go.
+            legacy = await repository.execute(
+                repository.table(TABLE_NAME).select("storage_path").eq("user_id", str(user.id)).is_("content_hash", "null")
+            )
+            await repository.delete(TABLE_NAME, user_id=str(user.id))
+            self.pages.pop(str(user.id))
             await interaction.response.send_message("🗑️ Your image library has been cleared.", ephemeral=True)
         except Exception as e:
             print(f"[imagesync] Clear failed: {e}")
-            await interaction.response.send_message("⚠️ Failed to clear images.", ephemeral=True)
+            return await interaction.response.send_message("⚠️ Failed to clear images.", ephemeral=True)
+
+        # The images trigger dropped the blob ref counts; delete objects nobody references now.
+        try:
+            orphaned = await repository.rpc("collect_image_blobs") or []
+            paths = [row["storage_path"] for row in orphaned + legacy if row.get("storage_path")]
+            await repository.remove_files(BUCKET_NAME, paths)
+        except Exception as e:
+            print(f"[imagesync] Storage cleanup failed: {e}")
 
 
 async def setup(bot: commands.Bot):
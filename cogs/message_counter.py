@@ -2,19 +2,15 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from supabase import create_client, Client
 from datetime import datetime
-import os
-from cogs.database import supabase
+from utils import repository
+from utils.leaderboard import TopNCache
+from utils.write_buffer import CoalescingBuffer
 
-# ------------------- Supabase Connection -------------------
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
-if not SUPABASE_URL or not SUPABASE_KEY:
-    raise ValueError("❌ Missing SUPABASE_URL or SUPABASE_KEY in environment variables.")
-
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# ------------------- Write-Behind Settings -------------------
+FLUSH_INTERVAL = 10.0  # seconds between bulk writes
+FLUSH_THRESHOLD = 500  # flush early once this many members are pending
 
 
 class MessageCounter(commands.Cog):
@@ -22,6 +18,35 @@ class MessageCounter(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        # (guild_id, user_id) -> messages not yet written to Supabase
+        self.pending = CoalescingBuffer(
+            self.flush_counts,
+            interval=FLUSH_INTERVAL,
+            max_pending=FLUSH_THRESHOLD,
+            name="MessageCounter",
+        )
+        self.top = TopNCache(size=10)
+
+    def cache_stats(self) -> dict:
+        return {"Top chatters": self.top.stats()}
+
+    async def cog_load(self):
+        self.pending.start()
+
+    async def cog_unload(self):
+        # Also runs on bot shutdown, so buffered counts are never dropped.
+        await self.pending.close()
+
+    async def flush_counts(self, deltas: dict):
+        """Write all buffered deltas as one server-side increment."""
+        now = datetime.utcnow().isoformat()
+        payload = [
+            {"guild_id": guild_id, "user_id": user_id, "delta": delta, "last_updated": now}
+            for (guild_id, user_id), delta in deltas.items()
+        ]
+        rows = await repository.rpc("increment_message_counts", {"deltas": payload})
+        for row in rows or []:
+            self.top.update(row["guild_id"], row["user_id"], row["count"])
 
     # ------------------- Message Tracking -------------------
     @commands.Cog.listener()
@@ -29,35 +54,7 @@ class MessageCounter(commands.Cog):
         if message.author.bot or not message.guild:
             return
 
-        guild_id = str(message.guild.id)
-        user_id = str(message.author.id)
-
-        try:
-            existing = (
-                supabase.table("message_counter")
-                .select("*")
-                .eq("guild_id", guild_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
-
-            if existing.data:
-                count = existing.data[0]["count"] + 1
-                supabase.table("message_counter").update(
-                    {"count": count, "last_updated": datetime.utcnow().isoformat()}
-                ).eq("guild_id", guild_id).eq("user_id", user_id).execute()
-            else:
-                supabase.table("message_counter").insert(
-                    {
-                        "guild_id": guild_id,
-                        "user_id": user_id,
-                        "count": 1,
-                        "last_updated": datetime.utcnow().isoformat(),
-                    }
-                ).execute()
-
-        except Exception as e:
-            print(f"[MessageCounter] ⚠️ Error updating message count: {e}")
+        self.pending.add((str(message.guild.id), str(message.author.id)))
 
     # ------------------- /messages command -------------------
     @app_commands.command(name="messages", description="Check your total message count in this server.")
@@ -66,17 +63,12 @@ class MessageCounter(commands.Cog):
         user_id = str(interaction.user.id)
 
         try:
-            data = (
-                supabase.table("message_counter")
-                .select("*")
-                .eq("guild_id", guild_id)
-                .eq("user_id", user_id)
-                .execute()
-            )
-            count = data.data[0]["count"] if data.data else 0
+            row = await repository.fetch_one("message_counter", "count", guild_id=guild_id, user_id=user_id)
+            count = row["count"] if row else 0
         except Exception as e:
             print(f"[MessageCounter] ⚠️ Fetch error: {e}")
             count = 0
+        count += self.pending.get((guild_id, user_id), 0)
 
         embed = discord.Embed(
             title="💬 Your Message Stats",
@@ -91,20 +83,19 @@ class MessageCounter(commands.Cog):
     async def leaderboard(self, interaction: discord.Interaction):
         guild_id = str(interaction.guild.id)
 
-        try:
-            data = (
-                supabase.table("message_counter")
-                .select("*")
-                .eq("guild_id", guild_id)
-                .order("count", desc=True)
-                .limit(10)
-                .execute()
-            )
-        except Exception as e:
-            print(f"[MessageCounter] ⚠️ Leaderboard fetch error: {e}")
-            return await interaction.response.send_message("⚠️ Couldn’t fetch leaderboard.", ephemeral=True)
-
-        if not data.data:
+        top = self.top.get(guild_id)
+        if top is None:
+            try:
+                rows = await repository.fetch(
+                    "message_counter", "user_id, count", order="count", desc=True, limit=self.top.capacity, guild_id=guild_id
+                )
+            except Exception as e:
+                print(f"[MessageCounter] ⚠️ Leaderboard fetch error: {e}")
+                return await interaction.response.send_message("⚠️ Couldn’t fetch leaderboard.", ephemeral=True)
+            self.top.load(guild_id, ((r["user_id"], r["count"]) for r in rows))
+            top = self.top.get(guild_id)
+
+        if not top:
             return await interaction.response.send_message("📭 No message data yet!", ephemeral=True)
 
         embed = discord.Embed(
@@ -113,10 +104,10 @@ class MessageCounter(commands.Cog):
         )
 
         desc = ""
-        for i, user in enumerate(data.data, start=1):
-            member = interaction.guild.get_member(int(user["user_id"]))
-            name = member.display_name if member else f"User {user['user_id']}"
-            desc += f"**#{i}** – {name}: **{user['count']:,} messages**\n"
+        for i, (user_id, count) in enumerate(top, start=1):
+            member = interaction.guild.get_member(int(user_id))
+            name = member.display_name if member else f"User {user_id}"
+            desc += f"**#{i}** – {name}: **{count:,} messages**\n"
 
         embed.description = desc
         embed.set_footer(text="Elura • Message Leaderboard System")
@@ -1,10 +1,20 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from cogs.database import supabase  # ✅ Shared Supabase client only
+from utils import repository, guild_settings  # ✅ Async access to the shared Supabase client
 from utils.embeds import elura_embed
+from utils.send_scheduler import Priority, scheduler
+from utils.pagination import KeysetView
+from typing import Optional
+import asyncio
 import datetime
-import random
+import re
+
+CASES_PER_PAGE = 8
+MASS_ACTION_LIMIT = 200  # targets per mass command (Discord's bulk ban maximum)
+MASS_ACTION_CONCURRENCY = 5  # kicks/timeouts in flight at once
+MASS_LOG_MENTIONS = 40  # targets listed in the summary modlog entry
+MODLOG_LINGER = 2.0  # seconds a modlog entry waits for others to share its message
 
 
 class Punishments(commands.Cog):
@@ -12,50 +22,201 @@ class Punishments(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.ensure_tables()
+        self.last_case_ids = {}  # guild_id -> newest case id handed out
+
+    async def cog_load(self):
+        await self.ensure_tables()
 
-    def ensure_tables(self):
+    async def ensure_tables(self):
         """Ensures the required tables exist in Supabase (auto-create if missing)."""
         for table_name in ("cases", "settings"):
             try:
-                supabase.table(table_name).select("*").limit(1).execute()
+                await repository.fetch(table_name, limit=1)
             except Exception:
                 print(f"⚠️ Warning: Could not verify '{table_name}' table in Supabase.")
 
+    async def create_cases(self, guild: discord.Guild, cases: list) -> list:
+        """
+        Insert cases with the guild's next sequential case ids, allocated and
+        written by one insert_cases call; returns the rows in order.
+        """
+        rows = await repository.rpc("insert_cases", {"p_guild_id": str(guild.id), "p_cases": cases}) or []
+        rows.sort(key=lambda row: row["case_id"])
+        if rows:
+            self.last_case_ids[str(guild.id)] = rows[-1]["case_id"]
+        return rows
+
     async def log_case(self, guild: discord.Guild, case_type: str, target, moderator, reason: str):
-        """Logs moderation actions to Supabase and sends mod log."""
-        case_id = random.randint(1000, 9999)
+        """Logs moderation actions to Supabase and queues the mod log entry (delivery is not awaited)."""
         timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
 
         # Insert case record
-        supabase.table("cases").insert({
-            "guild_id": str(guild.id),
-            "case_id": case_id,
+        rows = await self.create_cases(guild, [{
             "case_type": case_type,
             "user_id": str(target.id),
             "moderator_id": str(moderator.id),
             "reason": reason,
             "timestamp": timestamp
-        }).execute()
+        }])
+        case_id = rows[0]["case_id"]
 
-        # Fetch modlog channel
-        result = supabase.table("settings").select("modlog_channel").eq("guild_id", str(guild.id)).execute()
-        data = result.data
+        embed = elura_embed(
+            f"🧾 Case #{case_id} | {case_type}",
+            f"**User:** {target.mention}\n"
+            f"**Moderator:** {moderator.mention}\n"
+            f"**Reason:** {reason or 'No reason provided.'}"
+        )
+        embed.set_footer(text=f"Timestamp: {timestamp}")
+        await self.send_modlog(guild, embed)
+
+        return case_id
 
-        if data and data[0].get("modlog_channel"):
-            channel_id = int(data[0]["modlog_channel"])
-            channel = guild.get_channel(channel_id)
+    async def send_modlog(self, guild: discord.Guild, embed: discord.Embed):
+        """Queue a modlog embed; entries arriving within MODLOG_LINGER share one message (up to 10)."""
+        # Modlog channel from the cached guild settings
+        modlog_channel = await guild_settings.get_value(guild.id, "modlog_channel")
+
+        if modlog_channel:
+            channel = guild.get_channel(int(modlog_channel))
             if channel:
-                embed = elura_embed(
-                    f"🧾 Case #{case_id} | {case_type}",
-                    f"**User:** {target.mention}\n"
-                    f"**Moderator:** {moderator.mention}\n"
-                    f"**Reason:** {reason or 'No reason provided.'}"
-                )
-                embed.set_footer(text=f"Timestamp: {timestamp}")
-                await channel.send(embed=embed)
+                scheduler.enqueue(channel, priority=Priority.MODERATION, linger=MODLOG_LINGER, embed=embed)
 
-        return case_id
+    async def load_case_page(self, guild_id: str, user_id: str, cursor):
+        """A page of a user's cases older than ``cursor``, via the (guild_id, user_id, case_id) index."""
+        query = (
+            repository.table("cases").select("case_id, case_type, moderator_id, reason, timestamp")
+            .eq("guild_id", guild_id).eq("user_id", user_id)
+        )
+        if cursor is not None:
+            query = query.lt("case_id", cursor)
+        rows = await repository.execute(query.order("case_id", desc=True).limit(CASES_PER_PAGE + 1))
+        next_cursor = rows[CASES_PER_PAGE - 1]["case_id"] if len(rows) > CASES_PER_PAGE else None
+        return rows[:CASES_PER_PAGE], next_cursor
+
+    # ================== MASS MODERATION ==================
+
+    async def resolve_targets(self, guild: discord.Guild, user_ids: Optional[str], joined_within: Optional[int]) -> list:
+        """User ids from a pasted list and/or everyone who joined in the last ``joined_within`` minutes."""
+        ids = list(dict.fromkeys(int(i) for i in re.findall(r"\d{15,21}", user_ids or "")))
+        if joined_within:
+            since = discord.utils.utcnow() - datetime.timedelta(minutes=joined_within)
+            # The member cache also covers joins the welcomer is still holding in a burst, or failed to log.
+            members = sorted(
+                (m for m in guild.members if m.joined_at and m.joined_at >= since),
+                key=lambda m: m.joined_at, reverse=True
+            )
+            rows = await repository.execute(
+                repository.table("joins").select("user_id")
+                .eq("guild_id", str(guild.id)).gte("joined_at", since.replace(tzinfo=None).isoformat())
+                .order("joined_at", desc=True).limit(MASS_ACTION_LIMIT * 2)
+            )
+            joined = [m.id for m in members] + [int(row["user_id"]) for row in rows]
+            ids += [i for i in dict.fromkeys(joined) if i not in ids]
+        return ids
+
+    def can_act_on(self, moderator: discord.Member, user_id: int) -> bool:
+        """Skip the moderator, the bot, the owner and anyone at or above the moderator's top role."""
+        guild = moderator.guild
+        if user_id in (moderator.id, guild.me.id, guild.owner_id):
+            return False
+        member = guild.get_member(user_id)
+        return member is None or moderator.id == guild.owner_id or member.top_role < moderator.top_role
+
+    async def mass_action(self, interaction: discord.Interaction, action: str, user_ids: Optional[str], joined_within: Optional[int], reason: str, minutes: int = 0):
+        """Run one moderation action over many users, then log one case each in a single insert."""
+        await interaction.response.defer(thinking=True)
+        guild, moderator = interaction.guild, interaction.user
+
+        try:
+            ids = await self.resolve_targets(guild, user_ids, joined_within)
+        except Exception as e:
+            print(f"[Punishments] Target lookup failed: {e}")
+            return await interaction.followup.send(embed=elura_embed("⚠️ Lookup Failed", "Could not read recent joins."))
+        targets = [i for i in ids if self.can_act_on(moderator, i)][:MASS_ACTION_LIMIT]
+        if not targets:
+            return await interaction.followup.send(embed=elura_embed("📭 No Targets", "Nobody matched, or everyone matched is protected."))
+
+        audit_reason = f"{moderator} (mass {action}): {reason}"
+        if action == "ban":
+            # One request bans up to 200 users.
+            try:
+                result = await guild.bulk_ban([discord.Object(id=i) for i in targets], reason=audit_reason)
+                done = [user.id for user in result.banned]
+            except discord.HTTPException as e:
+                print(f"[Punishments] Bulk ban failed: {e}")
+                done = []
+            case_type = "Ban"
+        else:
+            slots = asyncio.Semaphore(MASS_ACTION_CONCURRENCY)
+            until = datetime.timedelta(minutes=minutes)
+
+            async def act(user_id: int) -> bool:
+                member = guild.get_member(user_id)
+                if member is None:
+                    return False
+                async with slots:
+                    try:
+                        if action == "kick":
+                            await member.kick(reason=audit_reason)
+                        else:
+                            await member.timeout(until, reason=audit_reason)
+                        return True
+                    except discord.HTTPException as e:
+                        print(f"[Punishments] Mass {action} failed for {user_id}: {e}")
+                        return False
+
+            outcomes = await asyncio.gather(*(act(i) for i in targets))
+            done = [i for i, ok in zip(targets, outcomes) if ok]
+            case_type = "Kick" if action == "kick" else f"Timeout ({minutes}m)"
+
+        timestamp = datetime.datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S")
+        rows = []
+        if done:
+            try:
+                rows = await self.create_cases(guild, [{
+                    "case_type": case_type,
+                    "user_id": str(user_id),
+                    "moderator_id": str(moderator.id),
+                    "reason": reason,
+                    "timestamp": timestamp
+                } for user_id in done])
+            except Exception as e:
+                print(f"[Punishments] Mass case insert failed: {e}")
+
+        case_range = f"#{rows[0]['case_id']}–#{rows[-1]['case_id']}" if rows else "not recorded"
+        mentions = " ".join(f"<@{i}>" for i in done[:MASS_LOG_MENTIONS])
+        if len(done) > MASS_LOG_MENTIONS:
+            mentions += f" and {len(done) - MASS_LOG_MENTIONS} more"
+        summary = (
+            f"**Action:** Mass {case_type}\n"
+            f"**Moderator:** {moderator.mention}\n"
+            f"**Reason:** {reason}\n"
+            f"**Succeeded:** {len(done)}/{len(targets)}\n"
+            f"**Cases:** {case_range}"
+        )
+        if done:
+            log = elura_embed(f"🧾 Mass {case_type} | {len(done)} users", f"{summary}\n\n{mentions}")
+            log.set_footer(text=f"Timestamp: {timestamp}")
+            await self.send_modlog(guild, log)
+        await interaction.followup.send(embed=elura_embed(f"🚨 Mass {case_type} Complete", summary))
+
+    @app_commands.command(name="massban", description="Ban many users at once by ID list or recent joins.")
+    @app_commands.describe(user_ids="User IDs separated by spaces or commas", joined_within="Also target everyone who joined in the last N minutes")
+    @app_commands.checks.has_permissions(ban_members=True)
+    async def massban(self, interaction: discord.Interaction, user_ids: Optional[str] = None, joined_within: Optional[int] = None, reason: str = "Mass ban"):
+        await self.mass_action(interaction, "ban", user_ids, joined_within, reason)
+
+    @app_commands.command(name="masskick", description="Kick many members at once by ID list or recent joins.")
+    @app_commands.describe(user_ids="User IDs separated by spaces or commas", joined_within="Also target everyone who joined in the last N minutes")
+    @app_commands.checks.has_permissions(kick_members=True)
+    async def masskick(self, interaction: discord.Interaction, user_ids: Optional[str] = None, joined_within: Optional[int] = None, reason: str = "Mass kick"):
+        await self.mass_action(interaction, "kick", user_ids, joined_within, reason)
+
+    @app_commands.command(name="masstimeout", description="Timeout many members at once by ID list or recent joins.")
+    @app_commands.describe(minutes="Timeout length in minutes (Discord allows up to 28 days)", user_ids="User IDs separated by spaces or commas", joined_within="Also target everyone who joined in the last N minutes")
+    @app_commands.checks.has_permissions(moderate_members=True)
+    async def masstimeout(self, interaction: discord.Interaction, minutes: app_commands.Range[int, 1, 40320], user_ids: Optional[str] = None, joined_within: Optional[int] = None, reason: str = "Mass timeout"):
+        await self.mass_action(interaction, "timeout", user_ids, joined_within, reason, minutes=minutes)
 
     # ================== MODERATION COMMANDS ==================
 
@@ -100,13 +261,54 @@ class Punishments(commands.Cog):
         embed = elura_embed("✅ User Unbanned", f"{user.mention} has been unbanned.\nCase ID: **#{case_id}**")
         await interaction.response.send_message(embed=embed)
 
+    @app_commands.command(name="cases", description="Show a user's moderation history.")
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def cases(self, interaction: discord.Interaction, user: discord.User):
+        def render(rows, page):
+            embed = elura_embed(f"📂 Cases for {user} — Page {page}", "")
+            for row in rows:
+                embed.add_field(
+                    name=f"#{row['case_id']} | {row['case_type']}",
+                    value=f"**Moderator:** <@{row['moderator_id']}>\n**Reason:** {row.get('reason') or 'No reason provided.'}\n{row.get('timestamp') or ''}",
+                    inline=False
+                )
+            return embed
+
+        view = KeysetView(lambda cursor: self.load_case_page(str(interaction.guild.id), str(user.id), cursor), render)
+        try:
+            rows = await view.load(0)
+        except Exception as e:
+            print(f"[Punishments] Case history failed: {e}")
+            return await interaction.response.send_message("⚠️ Could not fetch case history.", ephemeral=True)
+
+        if not rows:
+            return await interaction.response.send_message(embed=elura_embed("📂 No Cases", f"{user.mention} has a clean record."), ephemeral=True)
+        await interaction.response.send_message(embed=view.embed(rows), view=view, ephemeral=True)
+
+    @app_commands.command(name="case", description="Look up a moderation case by its ID.")
+    @app_commands.checks.has_permissions(manage_messages=True)
+    async def case(self, interaction: discord.Interaction, case_id: int):
+        guild_id = str(interaction.guild.id)
+        last = self.last_case_ids.get(guild_id)
+        row = None
+        if last is None or 0 < case_id <= last:
+            row = await repository.fetch_one("cases", guild_id=guild_id, case_id=case_id)
+        if not row:
+            return await interaction.response.send_message(embed=elura_embed("❓ Case Not Found", f"There is no case **#{case_id}**."), ephemeral=True)
+
+        embed = elura_embed(
+            f"🧾 Case #{row['case_id']} | {row['case_type']}",
+            f"**User:** <@{row['user_id']}>\n"
+            f"**Moderator:** <@{row['moderator_id']}>\n"
+            f"**Reason:** {row.get('reason') or 'No reason provided.'}"
+        )
+        embed.set_footer(text=f"Timestamp: {row.get('timestamp')}")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
     @app_commands.command(name="setmodlog", description="Set the moderation log channel.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def setmodlog(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        supabase.table("settings").upsert({
-            "guild_id": str(interaction.guild.id),
-            "modlog_channel": str(channel.id)
-        }).execute()
+        await guild_settings.update(interaction.guild.id, modlog_channel=str(channel.id))
 
         embed = elura_embed("✅ Mod Log Set", f"Moderation cases will be logged in {channel.mention}")
         await interaction.response.send_message(embed=embed, ephemeral=True)
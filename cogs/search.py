@@ -2,25 +2,162 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import aiohttp
+import asyncio
+import os
+import time
+from urllib.parse import quote, urlparse
 from utils.embeds import elura_embed
+from utils.cache import MISSING, TTLCache
+from utils.prefix_index import PrefixIndex
 from cogs.database import supabase
 
+# ------------------- Upstreams -------------------
+DDG_URL = "https://api.duckduckgo.com/"
+WIKI_SUMMARY_URL = "https://en.wikipedia.org/api/rest_v1/page/summary/"
+
+HOST_TIMEOUTS = {
+    "api.duckduckgo.com": aiohttp.ClientTimeout(total=5, sock_connect=2),
+    "en.wikipedia.org": aiohttp.ClientTimeout(total=6, sock_connect=2),
+}
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=8, sock_connect=3)
+
+# ------------------- Cache & Pool -------------------
+SEARCH_CACHE_SIZE = 2048
+SEARCH_CACHE_TTL = 900.0
+CONNECTION_LIMIT = 32
+CONNECTIONS_PER_HOST = 8
+
+# ------------------- Wiki Autocomplete -------------------
+WIKI_TITLES_FILE = os.getenv("WIKI_TITLES_FILE", "data/wiki_titles.txt")  # one title per line, optional
+AUTOCOMPLETE_LIMIT = 25  # Discord's maximum number of choices
+
+
+def normalize(query: str) -> str:
+    """Cache key for a query: case-folded with whitespace collapsed."""
+    return " ".join(query.split()).casefold()
+
+
+def wiki_title(topic: str) -> str:
+    """
+    The page title as sent to Wikipedia. Titles are case-sensitive after
+    the first letter, so this is also the cache key; only the first letter
+    is normalized, since Wikipedia upper-cases it anyway.
+    """
+    title = "_".join(topic.split())
+    return title[:1].upper() + title[1:]
+
+
 class Search(commands.Cog):
     """Modern and privacy-friendly search utilities for Elura."""
     def __init__(self, bot):
         self.bot = bot
+        self.session = None
+        self.cache = TTLCache(maxsize=SEARCH_CACHE_SIZE, ttl=SEARCH_CACHE_TTL)  # (kind, query) -> (status, data)
+        self.inflight = {}  # (kind, query) -> task shared by identical concurrent lookups
+        self.coalesced = 0
+        self.latency = {}  # host -> [requests, total seconds]
+        self.titles = PrefixIndex()  # wiki titles for /wiki autocomplete
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=CONNECTION_LIMIT, limit_per_host=CONNECTIONS_PER_HOST, ttl_dns_cache=300)
+        )
+        asyncio.create_task(self.load_titles())
+
+    async def load_titles(self):
+        """Build the title index from WIKI_TITLES_FILE off the event loop, if the file exists."""
+        if not os.path.exists(WIKI_TITLES_FILE):
+            return
+
+        def build():
+            index = PrefixIndex()
+            with open(WIKI_TITLES_FILE, encoding="utf-8") as f:
+                index.load(line.strip() for line in f)
+            return index
+
+        try:
+            index = await asyncio.to_thread(build)
+        except OSError as e:
+            return print(f"[Search] Could not load wiki titles: {e}")
+        # Keep titles learned from lookups while the file was loading.
+        for title in self.titles:
+            index.add(title)
+        self.titles = index
+        print(f"🔎 Loaded {len(index):,} wiki titles for autocomplete.")
+
+    async def cog_unload(self):
+        await self.session.close()
+
+    def cache_stats(self) -> dict:
+        latency = ", ".join(
+            f"{host} {total / count * 1000:.0f} ms" for host, (count, total) in self.latency.items() if count
+        )
+        detail = f"{self.coalesced:,} coalesced" + (f" • {latency}" if latency else "")
+        return {"Search results": {**self.cache.stats(), "detail": detail}}
+
+    # ------------------- Fetching -------------------
+    async def _fetch_json(self, url: str):
+        """GET ``url`` with its host's timeout; returns (status, json or None)."""
+        host = urlparse(url).hostname
+        start = time.perf_counter()
+        try:
+            async with self.session.get(url, timeout=HOST_TIMEOUTS.get(host, DEFAULT_TIMEOUT)) as response:
+                # DuckDuckGo labels its JSON application/x-javascript
+                data = await response.json(content_type=None) if response.status == 200 else None
+                return response.status, data
+        finally:
+            stat = self.latency.setdefault(host, [0, 0.0])
+            stat[0] += 1
+            stat[1] += time.perf_counter() - start
+
+    async def cached_fetch(self, key: tuple, url: str):
+        """
+        Fetch ``url`` through the TTL cache under ``key``. Identical lookups
+        already in flight share one upstream request instead of starting their own.
+        """
+        hit = self.cache.get(key, MISSING)
+        if hit is not MISSING:
+            return hit
+
+        task = self.inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._fetch_json(url))
+            self.inflight[key] = task
+            task.add_done_callback(lambda t: self._finish(key, t))
+        else:
+            self.coalesced += 1
+        # Shielded so one caller timing out doesn't cancel the request for the others.
+        return await asyncio.shield(task)
+
+    def _finish(self, key, task: asyncio.Task):
+        self.inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return  # errors and timeouts are not cached
+        status, _ = task.result()
+        if status in (200, 404):
+            self.cache.set(key, task.result())
 
     async def fetch_ddg(self, query):
         """Fetch DuckDuckGo Instant Answer API results."""
-        url = f"https://api.duckduckgo.com/?q={query}&format=json&no_redirect=1&no_html=1"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                return await response.json()
+        url = f"{DDG_URL}?q={quote(query)}&format=json&no_redirect=1&no_html=1"
+        _, data = await self.cached_fetch(("ddg", normalize(query)), url)
+        return data or {}
 
+    async def fetch_wiki(self, topic):
+        """Fetch a Wikipedia page summary, or None if there is no such page."""
+        title = wiki_title(topic)
+        _, data = await self.cached_fetch(("wiki", title), WIKI_SUMMARY_URL + quote(title, safe=""))
+        return data
+
+    # ------------------- Commands -------------------
     @app_commands.command(name="search", description="Search the web with Elura’s smart search system.")
     async def search(self, interaction: discord.Interaction, query: str):
         await interaction.response.defer()
-        data = await self.fetch_ddg(query)
+        try:
+            data = await self.fetch_ddg(query)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[Search] DuckDuckGo lookup failed: {e}")
+            data = {}
 
         title = data.get("Heading") or query.title()
         abstract = data.get("AbstractText", "")
@@ -41,15 +178,18 @@ class Search(commands.Cog):
     @app_commands.command(name="wiki", description="Get a quick summary from Wikipedia.")
     async def wiki(self, interaction: discord.Interaction, topic: str):
         await interaction.response.defer()
-        url = f"https://en.wikipedia.org/api/rest_v1/page/summary/{topic.replace(' ', '_')}"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(url) as response:
-                if response.status == 200:
-                    data = await response.json()
-                else:
-                    return await interaction.followup.send(embed=elura_embed("⚠️ Not Found", "No results found on Wikipedia."))
+        # Prefer the indexed spelling so case and spacing slips still resolve.
+        topic = self.titles.lookup(topic) or topic
+        try:
+            data = await self.fetch_wiki(topic)
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"[Search] Wikipedia lookup failed: {e}")
+            return await interaction.followup.send(embed=elura_embed("⚠️ Wikipedia Unavailable", "Wikipedia didn't answer in time. Try again shortly."))
+        if not data:
+            return await interaction.followup.send(embed=elura_embed("⚠️ Not Found", "No results found on Wikipedia."))
 
         title = data.get("title", topic.title())
+        self.titles.add(title)
         extract = data.get("extract", "No summary available.")
         page_url = data.get("content_urls", {}).get("desktop", {}).get("page", f"https://en.wikipedia.org/wiki/{topic.replace(' ', '_')}")
         image = data.get("thumbnail", {}).get("source")
@@ -62,5 +202,13 @@ class Search(commands.Cog):
 
         await interaction.followup.send(embed=embed)
 
+    @wiki.autocomplete("topic")
+    async def wiki_topic_autocomplete(self, interaction: discord.Interaction, current: str):
+        # In-memory only: answers well inside Discord's 3 second autocomplete deadline.
+        return [
+            app_commands.Choice(name=title[:100], value=title[:100])
+            for title in self.titles.search(current, AUTOCOMPLETE_LIMIT)
+        ]
+
 async def setup(bot):
-    await bot.add_cog(Search(bot))
\ No newline at end of file
+    await bot.add_cog(Search(bot))
@@ -2,7 +2,8 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 import asyncio
-from cogs.database import supabase  # ✅ use the shared Supabase client only
+from utils import repository, guild_settings, storage_stream  # ✅ async access to the shared Supabase client
+from utils.send_scheduler import scheduler
 
 ADMIN_ROLE_ID = 1431189241685344348  # Replace with your actual Admin Role ID
 
@@ -13,6 +14,9 @@ class Setup(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
 
+    def cache_stats(self) -> dict:
+        return {"Guild settings": guild_settings.stats()}
+
     @app_commands.command(name="setup", description="Initialize Elura Utility for this server.")
     async def setup_command(self, interaction: discord.Interaction):
         # ✅ Permission check
@@ -40,7 +44,7 @@ class Setup(commands.Cog):
 
         for table_name in required_tables:
             try:
-                supabase.table(table_name).select("*").limit(1).execute()
+                await repository.fetch(table_name, limit=1)
             except Exception:
                 missing_tables.append(table_name)
 
@@ -52,12 +56,9 @@ class Setup(commands.Cog):
 
         # ✅ Ensure guild is registered in settings
         try:
-            existing = supabase.table("settings").select("guild_id").eq("guild_id", str(guild.id)).execute()
-            if not existing.data:
-                supabase.table("settings").insert({
-                    "guild_id": str(guild.id),
-                    "language": "en"
-                }).execute()
+            existing = await guild_settings.get(guild.id)
+            if not existing:
+                await guild_settings.update(guild.id, language="en")
                 embed.description += f"\n\n🏠 Registered guild: `{guild.name}`"
             else:
                 embed.description += f"\n\n🔁 Guild `{guild.name}` already registered."
@@ -74,6 +75,62 @@ class Setup(commands.Cog):
         await asyncio.sleep(1)
         await msg.edit(embed=embed)
 
+    @app_commands.command(name="systemstatus", description="Show Elura's connection pool and cache status (admin only).")
+    async def system_status(self, interaction: discord.Interaction):
+        if not any(role.id == ADMIN_ROLE_ID for role in interaction.user.roles):
+            return await interaction.response.send_message("⚠️ You don't have permission to view system status.", ephemeral=True)
+
+        stats = repository.pool_stats()
+        embed = discord.Embed(title="🩺 Elura System Status", color=discord.Color.blurple())
+        embed.add_field(
+            name="Supabase Connections",
+            value=(
+                f"In use: **{stats['in_flight']}/{stats['pool_size']}** ({stats['utilisation']:.0%})\n"
+                f"Peak: **{stats['peak_in_flight']}**\n"
+                f"Requests: **{stats['requests']:,}** • Errors: **{stats['errors']:,}**\n"
+                f"Avg latency: **{stats['avg_latency_ms']:.0f} ms**"
+            ),
+            inline=False
+        )
+        embed.add_field(
+            name="Database Workers",
+            value=f"Calls in flight: **{stats['calls_in_flight']}** • Queued: **{stats['calls_queued']}** • Workers: **{stats['workers']}**",
+            inline=False
+        )
+        sends = scheduler.stats()
+        embed.add_field(
+            name="Send Scheduler",
+            value=(
+                f"Queued: **{sends['queued']}** in **{sends['channels_busy']}** channel(s) • Avg wait: **{sends['avg_wait'] * 1000:.0f} ms**\n"
+                f"Sent: **{sends['sent']:,}** • Packed away: **{sends['messages_saved']:,}** • "
+                f"Dropped: **{sends['dropped']:,}** • Failed: **{sends['failed']:,}**"
+            ),
+            inline=False
+        )
+        transfers = storage_stream.stats()
+        work = [
+            f"Transfer buffers: **{transfers['in_use_bytes'] / 2**20:.1f}/{transfers['budget_bytes'] / 2**20:.0f} MiB**"
+        ]
+        imagesync = self.bot.get_cog("ImageSync")
+        if imagesync is not None:
+            jobs = imagesync.jobs.stats()
+            work.insert(0, f"Image jobs running: **{jobs['jobs_active']}** • Cancelling: **{jobs['jobs_cancelling']}**")
+        embed.add_field(name="Background Work", value="\n".join(work), inline=False)
+
+        # Any cog can report its caches by defining cache_stats() -> {name: TTLCache.stats()}, plus an optional "detail" line
+        cache_lines = []
+        for cog in self.bot.cogs.values():
+            for name, cache in getattr(cog, "cache_stats", dict)().items():
+                cache_lines.append(
+                    f"**{name}:** {cache['size']:,}/{cache['maxsize']:,} • "
+                    f"hit rate {cache['hit_rate']:.0%} ({cache['hits']:,} hits, {cache['misses']:,} misses)"
+                    + (f" • {cache['detail']}" if cache.get("detail") else "")
+                )
+        if cache_lines:
+            embed.add_field(name="Caches", value="\n".join(cache_lines), inline=False)
+        embed.set_footer(text="Elura Utility • System Status")
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
 
 async def setup(bot: commands.Bot):
     await bot.add_cog(Setup(bot))
\ No newline at end of file
@@ -1,19 +1,25 @@
 import discord
 from discord.ext import commands
 from discord import app_commands
-from PIL import Image, ImageDraw, ImageFont
 from io import BytesIO
 from datetime import datetime
+from collections import deque
+import asyncio
+import time
 import aiohttp
-from cogs.database import supabase
-import os
+from utils import repository, banner, guild_settings  # ✅ Shared Supabase client via the async repository
+from utils.send_scheduler import scheduler
+from utils.cache import TTLCache
 
+AVATAR_CACHE_SIZE = 256  # decoded 180x180 RGBA tiles, ~130 KB each
+AVATAR_SIZE = 256  # smallest CDN size at or above the tile size
 
-# ✅ Supabase connection
-from supabase import create_client, Client
-SUPABASE_URL = os.getenv("SUPABASE_URL")
-SUPABASE_KEY = os.getenv("SUPABASE_KEY")
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# Join-burst mode: above BURST_THRESHOLD joins per BURST_RATE_WINDOW seconds,
+# joins are collected for BURST_WINDOW seconds and welcomed together.
+BURST_THRESHOLD = 10
+BURST_RATE_WINDOW = 10.0
+BURST_WINDOW = 5.0
+BURST_MENTIONS = 30  # members mentioned by name in a combined welcome
 
 
 class Welcomer(commands.Cog):
@@ -21,12 +27,31 @@ class Welcomer(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.ensure_table()
-
-    def ensure_table(self):
+        self.session = None
+        self.avatars = TTLCache(maxsize=AVATAR_CACHE_SIZE, ttl=None)  # avatar key -> tile
+        self.join_times = {}  # guild_id -> deque of recent join times
+        self.bursts = {}  # guild_id -> members waiting for a combined welcome
+        self.burst_tasks = {}  # guild_id -> pending flush task
+
+    async def cog_load(self):
+        self.session = aiohttp.ClientSession()
+        await self.ensure_table()
+
+    async def cog_unload(self):
+        # Welcome whoever is still buffered before the session goes away.
+        for task in self.burst_tasks.values():
+            task.cancel()
+        for guild_id in list(self.bursts):
+            await self.flush_burst(guild_id)
+        await self.session.close()
+
+    def cache_stats(self) -> dict:
+        return {"Avatar tiles": self.avatars.stats()}
+
+    async def ensure_table(self):
         """Auto-create the 'joins' table if missing."""
         try:
-            supabase.table("joins").select("*").limit(1).execute()
+            await repository.fetch("joins", limit=1)
         except Exception:
             ddl = """
             CREATE TABLE IF NOT EXISTS joins (
@@ -37,75 +62,131 @@ class Welcomer(commands.Cog):
                 joined_at TEXT NOT NULL
             );
             """
-            supabase.postgrest.rpc("exec", {"sql": ddl}).execute()
+            await repository.rpc("exec", {"sql": ddl})
             print("✅ 'joins' table auto-created in Supabase")
 
+    async def get_avatar_tile(self, member: discord.Member):
+        """Resized avatar tile, cached by avatar hash so repeat and default avatars skip the download and decode."""
+        asset = member.display_avatar
+        tile = self.avatars.get(asset.key)
+        if tile is None:
+            try:
+                async with self.session.get(asset.with_size(AVATAR_SIZE).url) as resp:
+                    resp.raise_for_status()
+                    avatar_bytes = await resp.read()
+                tile = await banner.decode_avatar(avatar_bytes)
+            except Exception as e:
+                print(f"[Welcomer] Could not fetch avatar for {member}: {e}")
+                return None
+            self.avatars.set(asset.key, tile)
+        return tile
+
     async def generate_welcome_image(self, member: discord.Member):
         """Creates a simple welcome banner with the member's avatar."""
-        base = Image.new("RGBA", (800, 250), (40, 44, 52, 255))
-        draw = ImageDraw.Draw(base)
-
-        # Fetch avatar
-        async with aiohttp.ClientSession() as session:
-            async with session.get(member.display_avatar.url) as resp:
-                avatar_bytes = await resp.read()
-
-        avatar = Image.open(BytesIO(avatar_bytes)).convert("RGBA")
-        avatar = avatar.resize((180, 180))
-        base.paste(avatar, (40, 35), avatar)
-
-        # Text setup
-        font_path = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
-        font_big = ImageFont.truetype(font_path, 50)
-        font_small = ImageFont.truetype(font_path, 30)
+        # Decoding and drawing happen on the banner pool, off the event loop
+        avatar = await self.get_avatar_tile(member)
+        png = await banner.render(avatar, member.name, len(member.guild.members))
+        return discord.File(BytesIO(png), filename="welcome.png")
+
+    async def get_welcome_channel(self, guild: discord.Guild):
+        channel_id = await guild_settings.get_value(guild.id, "welcome_channel")
+        return guild.get_channel(int(channel_id)) if channel_id else None
+
+    def join_row(self, member: discord.Member) -> dict:
+        return {
+            "guild_id": str(member.guild.id),
+            "user_id": str(member.id),
+            "username": str(member),
+            "joined_at": datetime.utcnow().isoformat()
+        }
+
+    def in_burst(self, guild_id: int) -> bool:
+        """Record a join and report whether the guild is joining faster than BURST_THRESHOLD."""
+        now = time.monotonic()
+        times = self.join_times.setdefault(guild_id, deque())
+        times.append(now)
+        while now - times[0] > BURST_RATE_WINDOW:
+            times.popleft()
+        return guild_id in self.bursts or len(times) >= BURST_THRESHOLD
+
+    # ------------------- Join Bursts -------------------
+    def buffer_join(self, member: discord.Member):
+        guild_id = member.guild.id
+        self.bursts.setdefault(guild_id, []).append((member, self.join_row(member)))
+        if guild_id not in self.burst_tasks:
+            self.burst_tasks[guild_id] = asyncio.create_task(self._flush_later(guild_id))
+
+    async def _flush_later(self, guild_id: int):
+        await asyncio.sleep(BURST_WINDOW)
+        self.burst_tasks.pop(guild_id, None)
+        await asyncio.shield(self.flush_burst(guild_id))
+
+    async def flush_burst(self, guild_id: int):
+        """Log a wave of joins in one insert and welcome them in one message."""
+        batch = self.bursts.pop(guild_id, [])
+        if not batch:
+            return
+        members = [member for member, _ in batch]
+        guild = members[0].guild
 
-        draw.text((250, 80), f"Welcome, {member.name}!", fill=(255, 255, 255), font=font_big)
-        draw.text((250, 150), f"You’re member #{len(member.guild.members)}!", fill=(180, 180, 180), font=font_small)
+        try:
+            await repository.insert_many("joins", [row for _, row in batch])
+        except Exception as e:
+            print(f"[Welcomer] Error logging {len(batch)} joins: {e}")
 
-        # Convert to Discord file
-        buffer = BytesIO()
-        base.save(buffer, "PNG")
-        buffer.seek(0)
-        return discord.File(buffer, filename="welcome.png")
+        try:
+            channel = await self.get_welcome_channel(guild)
+            if not channel:
+                return
+            tiles = await asyncio.gather(*(self.get_avatar_tile(m) for m in members[:banner.COLLAGE_MAX_TILES]))
+            png = await banner.collage(list(tiles), len(members))
+
+            mentions = ", ".join(m.mention for m in members[:BURST_MENTIONS])
+            if len(members) > BURST_MENTIONS:
+                mentions += f" and **{len(members) - BURST_MENTIONS}** more"
+            embed = discord.Embed(
+                title=f"🎉 Welcome to our {len(members)} new members!",
+                description=f"We’re glad you’re all here: {mentions}!",
+                color=discord.Color.green()
+            )
+            embed.set_footer(text=f"{guild.member_count} members • {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+            scheduler.enqueue(channel, embed=embed, file=discord.File(BytesIO(png), filename="welcome.png"))
+        except Exception as e:
+            print(f"[Welcomer] Error sending combined welcome: {e}")
 
+    # ------------------- Events -------------------
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
         """Triggered when a new member joins the server."""
+        if self.in_burst(member.guild.id):
+            # Raid or big event: welcome this wave together once it settles.
+            return self.buffer_join(member)
+
         # Store join event in Supabase
         try:
-            supabase.table("joins").insert({
-                "guild_id": str(member.guild.id),
-                "user_id": str(member.id),
-                "username": str(member),
-                "joined_at": datetime.utcnow().isoformat()
-            }).execute()
+            await repository.insert("joins", self.join_row(member))
         except Exception as e:
             print(f"[Welcomer] Error logging join: {e}")
 
-        # Fetch welcome channel from settings table
+        # Welcome channel from the cached guild settings
         try:
-            result = supabase.table("settings").select("welcome_channel").eq("guild_id", str(member.guild.id)).execute()
-            if result.data and result.data[0].get("welcome_channel"):
-                channel = member.guild.get_channel(int(result.data[0]["welcome_channel"]))
-                if channel:
-                    image_file = await self.generate_welcome_image(member)
-                    embed = discord.Embed(
-                        title=f"🎉 Welcome {member.name}!",
-                        description=f"We’re glad you’re here, {member.mention}!",
-                        color=discord.Color.green()
-                    )
-                    embed.set_footer(text=f"Joined at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
-                    await channel.send(embed=embed, file=image_file)
+            channel = await self.get_welcome_channel(member.guild)
+            if channel:
+                image_file = await self.generate_welcome_image(member)
+                embed = discord.Embed(
+                    title=f"🎉 Welcome {member.name}!",
+                    description=f"We’re glad you’re here, {member.mention}!",
+                    color=discord.Color.green()
+                )
+                embed.set_footer(text=f"Joined at {datetime.utcnow().strftime('%Y-%m-%d %H:%M:%S')} UTC")
+                scheduler.enqueue(channel, embed=embed, file=image_file)
         except Exception as e:
             print(f"[Welcomer] Error sending welcome message: {e}")
 
     @app_commands.command(name="setwelcome", description="Set the welcome channel for this server.")
     @app_commands.checks.has_permissions(manage_guild=True)
     async def setwelcome(self, interaction: discord.Interaction, channel: discord.TextChannel):
-        supabase.table("settings").upsert({
-            "guild_id": str(interaction.guild.id),
-            "welcome_channel": str(channel.id)
-        }).execute()
+        await guild_settings.update(interaction.guild.id, welcome_channel=str(channel.id))
         await interaction.response.send_message(f"✅ Welcome messages will now be sent in {channel.mention}.", ephemeral=True)
 
 
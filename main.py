@@ -3,6 +3,7 @@ from discord.ext import commands
 import os
 from dotenv import load_dotenv
 import asyncio
+from utils import guild_settings
 
 # ------------------- Load Environment -------------------
 load_dotenv()
@@ -25,13 +26,19 @@ bot = commands.Bot(command_prefix="/", intents=intents)
 @bot.event
 async def on_ready():
     await bot.tree.sync()
+    try:
+        await guild_settings.warm(guild.id for guild in bot.guilds)
+        print(f"⚙️ Cached settings for {len(bot.guilds)} guild(s).")
+    except Exception as e:
+        print(f"⚠️ Could not warm guild settings (they will load on demand): {e}")
     print(f"✅ Logged in as {bot.user} ({bot.user.id})")
     print("🔧 Slash commands are synced and bot is ready!")
     print("💾 Connected with Supabase backend and all cogs loaded.")
 
 # ------------------- Load All Cogs -------------------
 async def load_cogs():
-    for filename in os.listdir("./cogs"):
+    # cogs/database.py creates the schema on import, so it goes before any cog that queries it
+    for filename in sorted(os.listdir("./cogs"), key=lambda name: name != "database.py"):
         if filename.endswith(".py"):
             cog_name = f"cogs.{filename[:-3]}"
             try:
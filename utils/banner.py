@@ -0,0 +1,110 @@
+"""
+Elura Utility — Welcome Banner Renderer
+Builds welcome banners on a small thread pool so Pillow never blocks the
+gateway loop. The background template is drawn once, and each render
+thread loads its fonts once and keeps them. Output is PNG at a low
+compression level, which encodes several times faster than the default
+for a small increase in file size.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from typing import List, Optional
+
+from PIL import Image, ImageDraw, ImageFont
+
+# ------------------- Layout -------------------
+BANNER_SIZE = (800, 250)
+BACKGROUND = (40, 44, 52, 255)
+AVATAR_SIZE = (180, 180)
+AVATAR_POS = (40, 35)
+FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+PNG_COMPRESS_LEVEL = 1
+COLLAGE_TILE = 90
+COLLAGE_GAP = 8
+COLLAGE_COLUMNS = 8
+COLLAGE_MAX_TILES = 16  # two rows under the heading
+
+# ------------------- Render Pool -------------------
+BANNER_WORKERS = int(os.getenv("BANNER_WORKERS", "2"))
+
+_executor = ThreadPoolExecutor(max_workers=BANNER_WORKERS, thread_name_prefix="banner")
+_local = threading.local()  # per-thread fonts; FreeType faces are not shared across threads
+_TEMPLATE = Image.new("RGBA", BANNER_SIZE, BACKGROUND)
+
+
+def _fonts():
+    fonts = getattr(_local, "fonts", None)
+    if fonts is None:
+        try:
+            fonts = (ImageFont.truetype(FONT_PATH, 50), ImageFont.truetype(FONT_PATH, 30))
+        except OSError:
+            print(f"[Banner] ⚠️ Font {FONT_PATH} not found, using Pillow's default font.")
+            fonts = (ImageFont.load_default(50), ImageFont.load_default(30))
+        _local.fonts = fonts
+    return fonts
+
+
+def avatar_tile(avatar_bytes: bytes) -> Image.Image:
+    """Decode an avatar and resize it to the banner's avatar tile."""
+    return Image.open(BytesIO(avatar_bytes)).convert("RGBA").resize(AVATAR_SIZE)
+
+
+def render_banner(avatar: Optional[Image.Image], name: str, member_count: int) -> bytes:
+    """Draw one banner and return it as PNG bytes (blocking; run it on the pool)."""
+    font_big, font_small = _fonts()
+    base = _TEMPLATE.copy()
+    if avatar is not None:
+        base.paste(avatar, AVATAR_POS, avatar)
+
+    draw = ImageDraw.Draw(base)
+    draw.text((250, 80), f"Welcome, {name}!", fill=(255, 255, 255), font=font_big)
+    draw.text((250, 150), f"You’re member #{member_count}!", fill=(180, 180, 180), font=font_small)
+
+    buffer = BytesIO()
+    base.save(buffer, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+def render_collage(avatars: List[Optional[Image.Image]], joined: int) -> bytes:
+    """Draw one banner for a wave of joins: a heading over a grid of avatar tiles."""
+    _, font_small = _fonts()
+    base = _TEMPLATE.copy()
+    draw = ImageDraw.Draw(base)
+    left = (BANNER_SIZE[0] - COLLAGE_COLUMNS * (COLLAGE_TILE + COLLAGE_GAP) + COLLAGE_GAP) // 2
+    draw.text((left, 10), f"Welcome, {joined} new members!", fill=(255, 255, 255), font=font_small)
+
+    for i, avatar in enumerate(avatars[:COLLAGE_MAX_TILES]):
+        row, col = divmod(i, COLLAGE_COLUMNS)
+        x = left + col * (COLLAGE_TILE + COLLAGE_GAP)
+        y = 54 + row * (COLLAGE_TILE + COLLAGE_GAP)
+        if avatar is None:
+            draw.rectangle((x, y, x + COLLAGE_TILE, y + COLLAGE_TILE), fill=(60, 64, 72, 255))
+            continue
+        tile = avatar.resize((COLLAGE_TILE, COLLAGE_TILE))
+        base.paste(tile, (x, y), tile)
+
+    buffer = BytesIO()
+    base.save(buffer, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+async def decode_avatar(avatar_bytes: bytes) -> Image.Image:
+    """Decode and resize an avatar into a reusable tile, off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, avatar_tile, avatar_bytes)
+
+
+async def render(avatar: Optional[Image.Image], name: str, member_count: int) -> bytes:
+    """Render a banner around an avatar tile off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, render_banner, avatar, name, member_count)
+
+
+async def collage(avatars: List[Optional[Image.Image]], joined: int) -> bytes:
+    """Render a join-wave collage off the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, render_collage, avatars, joined)
@@ -0,0 +1,62 @@
+"""
+Elura Utility — Guild Settings Service
+Every read and write of the ``settings`` table goes through here.
+
+Rows are cached per guild, including the absence of a row, so joins and
+moderation cases don't query Supabase for settings that rarely change.
+Writes go to the database first and then update the cache, and the TTL
+bounds how long an edit made outside the bot can stay unseen.
+"""
+
+from typing import Any, Dict, Iterable
+
+from utils import repository
+from utils.cache import MISSING, TTLCache
+
+TABLE = "settings"
+SETTINGS_CACHE_SIZE = 10_000
+SETTINGS_TTL = 900.0  # seconds before a cached row is re-read
+WARM_CHUNK = 200  # guild ids per query when warming
+
+_cache = TTLCache(maxsize=SETTINGS_CACHE_SIZE, ttl=SETTINGS_TTL)
+
+
+async def get(guild_id) -> Dict[str, Any]:
+    """The guild's settings row, or {} if it has none."""
+    key = str(guild_id)
+    row = _cache.get(key, MISSING)
+    if row is MISSING:
+        row = await repository.fetch_one(TABLE, guild_id=key) or {}
+        _cache.set(key, row)
+    return row
+
+
+async def get_value(guild_id, column: str, default: Any = None) -> Any:
+    """One setting, e.g. ``await get_value(guild.id, "modlog_channel")``."""
+    value = (await get(guild_id)).get(column)
+    return default if value is None else value
+
+
+async def update(guild_id, **values: Any) -> Dict[str, Any]:
+    """Write-through upsert of some columns; returns the updated row."""
+    key = str(guild_id)
+    rows = await repository.upsert(TABLE, {"guild_id": key, **values}, on_conflict="guild_id")
+    cached = _cache.get(key, MISSING, count=False)
+    row = rows[0] if rows else {**(cached if cached is not MISSING else {"guild_id": key}), **values}
+    _cache.set(key, row)
+    return row
+
+
+async def warm(guild_ids: Iterable[int]):
+    """Load many guilds' settings in a few queries (called from on_ready)."""
+    keys = [str(guild_id) for guild_id in guild_ids]
+    for start in range(0, len(keys), WARM_CHUNK):
+        chunk = keys[start:start + WARM_CHUNK]
+        rows = await repository.execute(repository.table(TABLE).select("*").in_("guild_id", chunk))
+        found = {row["guild_id"]: row for row in rows}
+        for key in chunk:
+            _cache.set(key, found.get(key, {}))
+
+
+def stats() -> Dict[str, Any]:
+    return _cache.stats()
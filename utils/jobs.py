@@ -0,0 +1,183 @@
+"""
+Elura Utility — Background Jobs
+Long transfers run here instead of inside an interaction. Each job is a row
+in Supabase holding its status, progress and a checkpoint, so it can be
+reported on, cancelled, and resumed after a restart.
+"""
+
+import asyncio
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from utils import repository
+
+Handler = Callable[["Job"], Awaitable[None]]
+
+ACTIVE = ("queued", "running")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class JobCancelled(Exception):
+    """Raised inside a handler once its job has been cancelled."""
+
+
+class Job:
+    """A job's row plus the helpers its handler uses to checkpoint and report."""
+
+    def __init__(self, queue: "JobQueue", row: Dict[str, Any]):
+        self.queue = queue
+        self.row = row
+        self._last_report = 0.0
+
+    @property
+    def id(self) -> int:
+        return self.row["id"]
+
+    @property
+    def params(self) -> Dict[str, Any]:
+        return self.row.get("params") or {}
+
+    @property
+    def checkpoint(self) -> Dict[str, Any]:
+        return self.row.get("checkpoint") or {}
+
+    @property
+    def cancelled(self) -> bool:
+        return self.id in self.queue._cancelled
+
+    def raise_if_cancelled(self):
+        if self.cancelled:
+            raise JobCancelled()
+
+    async def save(self, *, force_report: bool = False, **values: Any):
+        """
+        Persist ``values`` (progress, total, checkpoint, ...) and report
+        progress, at most once per ``progress_interval`` unless forced.
+        """
+        self.row.update(values)
+        await repository.update(self.queue.table, {**values, "updated_at": _now()}, id=self.id)
+        await self.report(force=force_report)
+
+    async def report(self, force: bool = False):
+        if self.queue.on_progress is None:
+            return
+        now = time.monotonic()
+        if not force and now - self._last_report < self.queue.progress_interval:
+            return
+        self._last_report = now
+        try:
+            await self.queue.on_progress(self)
+        except Exception as e:
+            print(f"[{self.queue.name}] ⚠️ Progress update for job #{self.id} failed: {e}")
+
+
+class JobQueue:
+    """
+    Runs persisted jobs on background tasks, at most ``workers`` at once
+    overall and ``per_guild`` at once for any one guild.
+
+    ``handlers`` maps a job kind to a coroutine taking the :class:`Job`;
+    handlers should call ``job.raise_if_cancelled()`` between steps and
+    ``job.save(checkpoint=...)`` after each one so a resumed job carries
+    on where it stopped.
+    """
+
+    def __init__(
+        self,
+        table: str,
+        handlers: Dict[str, Handler],
+        *,
+        on_progress: Optional[Handler] = None,
+        workers: int = 4,
+        per_guild: int = 1,
+        progress_interval: float = 2.0,
+        name: str = "Jobs",
+    ):
+        self.table = table
+        self.handlers = handlers
+        self.on_progress = on_progress
+        self.progress_interval = progress_interval
+        self.name = name
+
+        self._slots = asyncio.Semaphore(workers)
+        self._guild_slots: Dict[str, asyncio.Semaphore] = defaultdict(lambda: asyncio.Semaphore(per_guild))
+        self._tasks: Dict[int, asyncio.Task] = {}
+        self._cancelled = set()
+
+    # ------------------- Scheduling -------------------
+    async def submit(self, kind: str, *, user_id: str, guild_id: str, channel_id: str, params: Optional[dict] = None, **extra: Any) -> Dict[str, Any]:
+        """Persist a new job and queue it; returns its row."""
+        rows = await repository.insert(self.table, {
+            "kind": kind,
+            "status": "queued",
+            "user_id": user_id,
+            "guild_id": guild_id,
+            "channel_id": channel_id,
+            "params": params or {},
+            **extra,
+        })
+        row = rows[0]
+        self._schedule(row)
+        return row
+
+    async def resume(self):
+        """Re-queue every job left queued or running by a previous process."""
+        rows = await repository.execute(
+            repository.table(self.table).select("*").in_("status", list(ACTIVE)).order("id")
+        )
+        for row in rows:
+            if row["id"] not in self._tasks:
+                self._schedule(row)
+        if rows:
+            print(f"[{self.name}] 🔁 Resumed {len(rows)} job(s).")
+
+    def _schedule(self, row: Dict[str, Any]):
+        self._tasks[row["id"]] = asyncio.create_task(self._run(Job(self, row)))
+
+    async def _run(self, job: Job):
+        status, error = "done", None
+        try:
+            # Guild slot first, so one busy guild never holds global slots while it waits.
+            async with self._guild_slots[job.row["guild_id"]], self._slots:
+                job.raise_if_cancelled()
+                await job.save(status="running", force_report=True)
+                await self.handlers[job.row["kind"]](job)
+        except JobCancelled:
+            status = "cancelled"
+        except asyncio.CancelledError:
+            # Shutting down: the row stays queued/running and is resumed next start.
+            raise
+        except Exception as e:
+            print(f"[{self.name}] ⚠️ Job #{job.id} failed: {e}")
+            status, error = "failed", str(e)[:500]
+        finally:
+            self._tasks.pop(job.id, None)
+
+        self._cancelled.discard(job.id)
+        try:
+            await job.save(status=status, error=error, force_report=True)
+        except Exception as e:
+            print(f"[{self.name}] ⚠️ Could not record the end of job #{job.id}: {e}")
+
+    # ------------------- Control -------------------
+    async def cancel(self, job_id: int):
+        """Stop a job at its next checkpoint (or before it starts)."""
+        self._cancelled.add(job_id)
+        if job_id not in self._tasks:
+            self._cancelled.discard(job_id)
+            await repository.update(self.table, {"status": "cancelled", "updated_at": _now()}, id=job_id)
+
+    async def close(self):
+        """Stop all job tasks; their rows stay active so :meth:`resume` picks them up."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stats(self) -> Dict[str, int]:
+        return {"jobs_active": len(self._tasks), "jobs_cancelling": len(self._cancelled)}
@@ -0,0 +1,77 @@
+import heapq
+from operator import itemgetter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from utils.cache import TTLCache
+
+# ───────────────────────────────
+# 🏆 Incremental Top-N Leaderboards
+# ───────────────────────────────
+
+
+class _Board:
+    __slots__ = ("scores", "complete")
+
+    def __init__(self, scores: Dict[str, int], complete: bool):
+        self.scores = scores      # user_id -> score, at most `capacity` entries
+        self.complete = complete  # True when every user of the guild is tracked
+
+
+class TopNCache:
+    """
+    Per-guild top scores kept current from the increment paths.
+
+    Each guild board tracks the best ``capacity`` users (a little more than
+    the ``size`` shown) so evictions rarely force a reload. Boards are
+    rebuilt from the database on a miss, whenever an update makes the
+    order uncertain, and once they are older than ``refresh_after``
+    seconds, which reconciles them with the database.
+    """
+
+    def __init__(self, size: int = 10, capacity: int = 50, max_guilds: int = 1000, refresh_after: float = 600.0):
+        self.size = size
+        self.capacity = capacity
+        self._boards = TTLCache(maxsize=max_guilds, ttl=refresh_after)
+
+    def get(self, guild_id: str) -> Optional[List[Tuple[str, int]]]:
+        """Top ``size`` (user_id, score) pairs, or None if the board must be loaded."""
+        board = self._boards.get(guild_id)
+        if board is None:
+            return None
+        return heapq.nlargest(self.size, board.scores.items(), key=itemgetter(1))
+
+    def load(self, guild_id: str, rows: Iterable[Tuple[str, int]]):
+        """Install a board from the database's top ``capacity`` rows."""
+        scores = dict(rows)
+        self._boards.set(guild_id, _Board(scores, complete=len(scores) < self.capacity))
+
+    def update(self, guild_id: str, user_id: str, score: int):
+        """Record a user's new total score."""
+        board = self._boards.get(guild_id, count=False)
+        if board is None:
+            return  # not loaded; the next read fetches fresh data
+
+        scores = board.scores
+        if user_id in scores:
+            dropped_out = not board.complete and score < scores[user_id] and score < min(scores.values())
+            if dropped_out:
+                # An untracked user may now outrank them; rebuild on next read.
+                self._boards.pop(guild_id)
+            else:
+                scores[user_id] = score
+            return
+
+        if board.complete:
+            scores[user_id] = score
+            if len(scores) > self.capacity:
+                del scores[min(scores, key=scores.get)]
+                board.complete = False
+            return
+
+        floor_user = min(scores, key=scores.get)
+        if score > scores[floor_user]:
+            del scores[floor_user]
+            scores[user_id] = score
+
+    def stats(self) -> dict:
+        return self._boards.stats()
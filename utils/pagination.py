@@ -0,0 +1,67 @@
+from typing import Any, Awaitable, Callable, List, Optional, Tuple
+
+import discord
+
+# ───────────────────────────────
+# 📑 Keyset Pagination Buttons
+# ───────────────────────────────
+
+Page = Tuple[List[dict], Optional[Any]]  # (rows, cursor of the next page or None)
+
+
+class KeysetView(discord.ui.View):
+    """
+    Prev/Next buttons over newest-first rows, paging by cursor instead of offset.
+
+    ``load(cursor)`` returns one page of rows older than ``cursor`` (None
+    means the newest) plus the cursor of the page after it, or None on the
+    last page. ``render(rows, page_number)`` builds the embed to show.
+    Passing ``start`` (the cursor of page ``first_page``) opens the view
+    partway through; paging back stops at that page.
+    """
+
+    def __init__(
+        self,
+        load: Callable[[Optional[Any]], Awaitable[Page]],
+        render: Callable[[List[dict], int], discord.Embed],
+        *,
+        start: Optional[Any] = None,
+        first_page: int = 1,
+        timeout: float = 180,
+    ):
+        super().__init__(timeout=timeout)
+        self._load = load
+        self._render = render
+        self.cursors: List[Optional[Any]] = [start]  # cursors[i] starts page first_page + i
+        self.first_page = first_page
+        self.index = 0
+
+    async def load(self, index: int) -> List[dict]:
+        """Fetch page ``index`` (its cursor must be known) and update the buttons."""
+        rows, next_cursor = await self._load(self.cursors[index])
+        del self.cursors[index + 1:]
+        if next_cursor is not None:
+            self.cursors.append(next_cursor)
+        self.index = index
+        self.previous_page.disabled = index == 0
+        self.next_page.disabled = next_cursor is None
+        return rows
+
+    def embed(self, rows: List[dict]) -> discord.Embed:
+        return self._render(rows, self.first_page + self.index)
+
+    async def _show(self, interaction: discord.Interaction, index: int):
+        try:
+            rows = await self.load(index)
+        except Exception as e:
+            print(f"[Pagination] Page load failed: {e}")
+            return await interaction.response.send_message("⚠️ Could not load that page.", ephemeral=True)
+        await interaction.response.edit_message(embed=self.embed(rows), view=self)
+
+    @discord.ui.button(label="◀ Prev", style=discord.ButtonStyle.secondary)
+    async def previous_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, max(self.index - 1, 0))
+
+    @discord.ui.button(label="Next ▶", style=discord.ButtonStyle.secondary)
+    async def next_page(self, interaction: discord.Interaction, button: discord.ui.Button):
+        await self._show(interaction, self.index + 1)
@@ -0,0 +1,59 @@
+from bisect import bisect_left, insort
+from typing import Iterable, List, Optional
+
+# ───────────────────────────────
+# 🔎 Sorted Prefix Index
+# ───────────────────────────────
+
+
+def _key(title: str) -> str:
+    return " ".join(title.replace("_", " ").split()).casefold()
+
+
+class PrefixIndex:
+    """
+    Titles kept sorted by their case-folded form, so every title starting
+    with a prefix sits in one contiguous run found by binary search.
+    Lookups are O(log n + results) with no network involved.
+    """
+
+    def __init__(self):
+        self._keys: List[str] = []
+        self._titles = {}  # key -> title as it should be shown
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __iter__(self):
+        return iter(self._titles.values())
+
+    def add(self, title: str):
+        key = _key(title)
+        if not key:
+            return
+        if key not in self._titles:
+            insort(self._keys, key)
+        self._titles[key] = title.replace("_", " ").strip()
+
+    def load(self, titles: Iterable[str]):
+        """Bulk-add titles (one sort instead of one insertion each)."""
+        for title in titles:
+            key = _key(title)
+            if key:
+                self._titles[key] = title.replace("_", " ").strip()
+        self._keys = sorted(self._titles)
+
+    def lookup(self, title: str) -> Optional[str]:
+        """The indexed spelling of ``title``, ignoring case and spacing."""
+        return self._titles.get(_key(title))
+
+    def search(self, prefix: str, limit: int = 25) -> List[str]:
+        """Up to ``limit`` titles starting with ``prefix``, in sorted order."""
+        key = _key(prefix)
+        start = bisect_left(self._keys, key)
+        matches = []
+        for candidate in self._keys[start:start + limit]:
+            if not candidate.startswith(key):
+                break
+            matches.append(self._titles[candidate])
+        return matches
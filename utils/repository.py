@@ -0,0 +1,173 @@
+"""
+Elura Utility — Async Repository
+Every Supabase call made from a coroutine goes through here.
+
+supabase-py is synchronous, so each query runs on a bounded thread pool
+instead of the gateway loop. Handlers only await the result, which lets
+many events query the database at the same time.
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable, Dict, Iterable, List, Optional, TypeVar
+
+from utils.supabase_client import pool_stats as http_pool_stats, supabase
+
+Row = Dict[str, Any]
+T = TypeVar("T")
+
+# ------------------- Worker Pool -------------------
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))
+BULK_CHUNK_SIZE = 500  # rows per request for bulk writes
+
+_executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase")
+_in_flight = 0  # calls submitted and not yet finished (running + queued)
+
+
+async def run_sync(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run any blocking Supabase call (tables, storage, rpc) on the worker pool."""
+    global _in_flight
+    loop = asyncio.get_running_loop()
+    _in_flight += 1
+    try:
+        return await loop.run_in_executor(_executor, partial(fn, *args, **kwargs))
+    finally:
+        _in_flight -= 1
+
+
+def pool_stats() -> Dict[str, Any]:
+    """Worker pool and HTTP connection pool utilisation."""
+    return {
+        "workers": DB_MAX_WORKERS,
+        "calls_in_flight": _in_flight,
+        "calls_queued": max(0, _in_flight - DB_MAX_WORKERS),
+        **http_pool_stats(),
+    }
+
+
+def table(name: str):
+    """Start a query builder for ``name``; finish it with ``await execute(...)``."""
+    return supabase.table(name)
+
+
+async def execute(query) -> List[Row]:
+    """Execute a prepared query builder and return its rows."""
+    result = await run_sync(query.execute)
+    return result.data or []
+
+
+def _where(query, filters: Dict[str, Any]):
+    for column, value in filters.items():
+        query = query.eq(column, value)
+    return query
+
+
+def _chunks(rows: List[Row]) -> Iterable[List[Row]]:
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        yield rows[start:start + BULK_CHUNK_SIZE]
+
+
+# ------------------- Reads -------------------
+async def fetch(
+    table_name: str,
+    columns: str = "*",
+    *,
+    order: Optional[str] = None,
+    desc: bool = False,
+    limit: Optional[int] = None,
+    **filters: Any,
+) -> List[Row]:
+    """Select rows matching equality ``filters``."""
+    query = _where(supabase.table(table_name).select(columns), filters)
+    if order:
+        query = query.order(order, desc=desc)
+    if limit:
+        query = query.limit(limit)
+    return await execute(query)
+
+
+async def count(table_name: str, **filters: Any) -> int:
+    """Count rows matching ``filters`` without transferring them."""
+    query = _where(supabase.table(table_name).select("id", count="exact"), filters).limit(1)
+    result = await run_sync(query.execute)
+    return result.count or 0
+
+
+async def fetch_one(table_name: str, columns: str = "*", **filters: Any) -> Optional[Row]:
+    """Return the first row matching ``filters``, or None."""
+    rows = await fetch(table_name, columns, limit=1, **filters)
+    return rows[0] if rows else None
+
+
+# ------------------- Writes -------------------
+async def insert(table_name: str, row: Row) -> List[Row]:
+    """Insert a single row."""
+    return await execute(supabase.table(table_name).insert(row))
+
+
+async def insert_many(table_name: str, rows: List[Row]) -> List[Row]:
+    """Insert many rows in as few requests as possible."""
+    inserted: List[Row] = []
+    for chunk in _chunks(rows):
+        inserted += await execute(supabase.table(table_name).insert(chunk))
+    return inserted
+
+
+async def upsert(table_name: str, row: Row, on_conflict: str = "") -> List[Row]:
+    """Insert or update a single row."""
+    return await execute(supabase.table(table_name).upsert(row, on_conflict=on_conflict))
+
+
+async def upsert_many(table_name: str, rows: List[Row], on_conflict: str = "") -> List[Row]:
+    """Insert or update many rows in as few requests as possible."""
+    written: List[Row] = []
+    for chunk in _chunks(rows):
+        written += await execute(supabase.table(table_name).upsert(chunk, on_conflict=on_conflict))
+    return written
+
+
+async def update(table_name: str, values: Row, **filters: Any) -> List[Row]:
+    """Update rows matching ``filters``."""
+    return await execute(_where(supabase.table(table_name).update(values), filters))
+
+
+async def delete(table_name: str, **filters: Any) -> List[Row]:
+    """Delete rows matching ``filters``."""
+    return await execute(_where(supabase.table(table_name).delete(), filters))
+
+
+# ------------------- Server-Side Functions -------------------
+async def rpc(fn: str, params: Optional[Dict[str, Any]] = None) -> Any:
+    """Call a Postgres function and return its raw result."""
+    result = await run_sync(supabase.rpc(fn, params or {}).execute)
+    return result.data
+
+
+async def increment(fn: str, params: Dict[str, Any]) -> int:
+    """Call a Postgres function that returns a single number (e.g. a new total)."""
+    data = await rpc(fn, params)
+    if isinstance(data, list):
+        data = data[0] if data else 0
+    if isinstance(data, dict):
+        data = next(iter(data.values()), 0)
+    return int(data or 0)
+
+
+# ------------------- Storage -------------------
+async def list_buckets() -> List[str]:
+    """Return the names of all storage buckets."""
+    buckets = await run_sync(supabase.storage.list_buckets)
+    return [bucket.name for bucket in buckets]
+
+
+async def create_bucket(name: str, public: bool = False):
+    """Create a storage bucket."""
+    await run_sync(supabase.storage.create_bucket, name, options={"public": public})
+
+
+async def remove_files(bucket: str, paths: List[str]):
+    """Delete objects from a bucket."""
+    if paths:
+        await run_sync(supabase.storage.from_(bucket).remove, paths)
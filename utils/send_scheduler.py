@@ -0,0 +1,239 @@
+"""
+Elura Utility — Outbound Send Scheduler
+Every bulk or bursty channel send goes through here instead of calling
+``channel.send`` directly.
+
+Each channel gets a token bucket matching Discord's per-channel limit, so
+bursts queue in memory instead of running into 429s. Queued sends leave in
+priority order, moderation before fun, and runs of queued embed-only
+messages are packed into a single message of up to 10 embeds. A send
+can also ``linger`` briefly so that more embeds can join it.
+"""
+
+import asyncio
+import heapq
+import itertools
+import time
+from enum import IntEnum
+from typing import Any, Dict, List, Optional
+
+import discord
+
+from utils.cache import MISSING, TTLCache
+
+# ------------------- Limits -------------------
+CHANNEL_RATE = 5  # messages per channel...
+CHANNEL_PER = 5.0  # ...per this many seconds (Discord's per-channel limit)
+MAX_QUEUED_PER_CHANNEL = 100
+MAX_EMBEDS_PER_MESSAGE = 10
+MAX_EMBED_CHARS_PER_MESSAGE = 6000
+MAX_TRACKED_BUCKETS = 10_000
+
+
+class Priority(IntEnum):
+    MODERATION = 0
+    NORMAL = 1
+    FUN = 2
+
+
+class SendDropped(Exception):
+    """Set on a send's future when its channel queue overflowed."""
+
+
+class _Send:
+    __slots__ = ("priority", "seq", "kwargs", "future", "queued_at", "linger")
+
+    def __init__(self, priority: int, seq: int, kwargs: Dict[str, Any], future: asyncio.Future, linger: float):
+        self.priority = priority
+        self.seq = seq
+        self.kwargs = kwargs
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.linger = linger
+
+    def __lt__(self, other: "_Send") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+    @property
+    def embeds(self) -> Optional[List[discord.Embed]]:
+        """The embeds of an embed-only send (which can be packed with others), else None."""
+        if set(self.kwargs) == {"embed"}:
+            return [self.kwargs["embed"]]
+        if set(self.kwargs) == {"embeds"}:
+            return list(self.kwargs["embeds"])
+        return None
+
+
+class _Lane:
+    """One channel's queue and the worker draining it."""
+
+    def __init__(self, channel: discord.abc.Messageable):
+        self.channel = channel
+        self.heap: List[_Send] = []
+        self.worker: Optional[asyncio.Task] = None
+        self.wakeup = asyncio.Event()  # set when a lingering send's message is full
+
+
+class SendScheduler:
+    """Per-channel, priority-ordered, rate-limited message delivery."""
+
+    def __init__(self):
+        self._lanes: Dict[int, _Lane] = {}
+        # channel_id -> (tokens, updated). Kept apart from the lanes, which are
+        # dropped whenever a queue empties. A bucket left alone for CHANNEL_PER
+        # seconds is full again, so it can expire after that long.
+        self._buckets = TTLCache(maxsize=MAX_TRACKED_BUCKETS, ttl=CHANNEL_PER)
+        self._seq = itertools.count()
+        self.sent = 0
+        self.messages_saved = 0
+        self.dropped = 0
+        self.failed = 0
+        self._wait_total = 0.0
+
+    # ------------------- Queueing -------------------
+    def enqueue(
+        self,
+        channel: discord.abc.Messageable,
+        *,
+        priority: Priority = Priority.NORMAL,
+        linger: float = 0.0,
+        **kwargs: Any,
+    ) -> asyncio.Future:
+        """
+        Queue ``channel.send(**kwargs)``; returns a future for the sent message.
+
+        An embed-only send with ``linger`` waits up to that many seconds
+        after being queued, or until enough embeds are queued behind it to
+        fill its message, so later embeds can be packed into it.
+        Awaiting the future is optional. Failures are logged either way.
+        """
+        future = asyncio.get_running_loop().create_future()
+        future.add_done_callback(self._log_failure)
+
+        lane = self._lanes.get(channel.id)
+        if lane is None:
+            lane = self._lanes[channel.id] = _Lane(channel)
+        heapq.heappush(lane.heap, _Send(priority, next(self._seq), kwargs, future, linger))
+
+        if len(lane.heap) > MAX_QUEUED_PER_CHANNEL:
+            # Backpressure: shed the lowest-priority, newest send.
+            victim = max(lane.heap)
+            lane.heap.remove(victim)
+            heapq.heapify(lane.heap)
+            self.dropped += 1
+            victim.future.set_exception(SendDropped(f"send queue for channel {channel.id} is full"))
+
+        if self._batch_full(lane):
+            lane.wakeup.set()
+        if lane.worker is None or lane.worker.done():
+            lane.worker = asyncio.create_task(self._drain(lane))
+        return future
+
+    @staticmethod
+    def _log_failure(future: asyncio.Future):
+        if not future.cancelled() and future.exception() is not None:
+            print(f"[SendScheduler] ⚠️ Send failed: {future.exception()}")
+
+    # ------------------- Delivery -------------------
+    async def _take_token(self, channel_id: int):
+        while True:
+            now = time.monotonic()
+            bucket = self._buckets.get(channel_id, MISSING, count=False)
+            tokens, updated = (float(CHANNEL_RATE), now) if bucket is MISSING else bucket
+            tokens = min(CHANNEL_RATE, tokens + (now - updated) * CHANNEL_RATE / CHANNEL_PER)
+            if tokens >= 1:
+                self._buckets.set(channel_id, (tokens - 1, now))
+                return
+            self._buckets.set(channel_id, (tokens, now))
+            await asyncio.sleep((1 - tokens) * CHANNEL_PER / CHANNEL_RATE)
+
+    @staticmethod
+    def _batch_full(lane: _Lane) -> bool:
+        """Whether the queued run of embed-only sends already fills a whole message."""
+        count = chars = 0
+        for item in sorted(lane.heap):
+            embeds = item.embeds
+            if embeds is None:
+                return False
+            more_chars = sum(len(e) for e in embeds)
+            if count + len(embeds) > MAX_EMBEDS_PER_MESSAGE or chars + more_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                return True
+            count += len(embeds)
+            chars += more_chars
+        return count >= MAX_EMBEDS_PER_MESSAGE
+
+    def _next_batch(self, lane: _Lane) -> List[_Send]:
+        """Pop the next send, plus any embed-only sends queued right behind it that fit in one message."""
+        batch = [heapq.heappop(lane.heap)]
+        embeds = batch[0].embeds
+        if embeds is None:
+            return batch
+        count, chars = len(embeds), sum(len(e) for e in embeds)
+        while lane.heap:
+            more = lane.heap[0].embeds
+            if more is None:
+                break
+            more_chars = sum(len(e) for e in more)
+            if count + len(more) > MAX_EMBEDS_PER_MESSAGE or chars + more_chars > MAX_EMBED_CHARS_PER_MESSAGE:
+                break
+            batch.append(heapq.heappop(lane.heap))
+            count += len(more)
+            chars += more_chars
+        return batch
+
+    async def _drain(self, lane: _Lane):
+        try:
+            while lane.heap:
+                head = lane.heap[0]
+                wait = head.queued_at + head.linger - time.monotonic()
+                if wait > 0 and head.embeds is not None and not self._batch_full(lane):
+                    lane.wakeup.clear()
+                    try:
+                        await asyncio.wait_for(lane.wakeup.wait(), wait)
+                    except asyncio.TimeoutError:
+                        pass
+                await self._take_token(lane.channel.id)
+                if not lane.heap:
+                    break
+                batch = self._next_batch(lane)
+                now = time.monotonic()
+                self._wait_total += sum(now - item.queued_at for item in batch)
+
+                if len(batch) == 1:
+                    kwargs = batch[0].kwargs
+                else:
+                    kwargs = {"embeds": [e for item in batch for e in item.embeds]}
+                    self.messages_saved += len(batch) - 1
+
+                try:
+                    message = await lane.channel.send(**kwargs)
+                except Exception as e:
+                    self.failed += len(batch)
+                    for item in batch:
+                        if not item.future.done():
+                            item.future.set_exception(e)
+                    continue
+                self.sent += len(batch)
+                for item in batch:
+                    if not item.future.done():
+                        item.future.set_result(message)
+        finally:
+            # Idle lanes are dropped so the map only holds busy channels.
+            if not lane.heap and self._lanes.get(lane.channel.id) is lane:
+                del self._lanes[lane.channel.id]
+
+    # ------------------- Metrics -------------------
+    def stats(self) -> Dict[str, Any]:
+        finished = self.sent + self.failed
+        return {
+            "channels_busy": len(self._lanes),
+            "queued": sum(len(lane.heap) for lane in self._lanes.values()),
+            "sent": self.sent,
+            "messages_saved": self.messages_saved,
+            "dropped": self.dropped,
+            "failed": self.failed,
+            "avg_wait": self._wait_total / finished if finished else 0.0,
+        }
+
+
+scheduler = SendScheduler()
@@ -0,0 +1,169 @@
+"""
+Elura Utility — Streaming Storage Transfers
+Moves files between HTTP responses, Supabase Storage and Discord in
+fixed-size chunks, so memory stays flat however large or numerous the
+transfers are. Spooled files share one in-memory byte budget, and any
+file that doesn't fit in it is spooled to disk.
+"""
+
+import hashlib
+import os
+import tempfile
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+import aiohttp
+
+from utils.supabase_client import SUPABASE_URL, SUPABASE_KEY
+
+# ------------------- Limits (override in .env) -------------------
+CHUNK_SIZE = 64 * 1024
+MAX_FILE_BYTES = int(os.getenv("IMAGESYNC_MAX_FILE_BYTES", str(25 * 1024 * 1024)))
+TRANSFER_BUDGET_BYTES = int(os.getenv("IMAGESYNC_TRANSFER_BUDGET_BYTES", str(64 * 1024 * 1024)))
+SPOOL_MEMORY_BYTES = 1024 * 1024  # spooled files spill to disk beyond this
+
+_STORAGE_URL = SUPABASE_URL.rstrip("/") + "/storage/v1/object"
+_AUTH_HEADERS = {"apikey": SUPABASE_KEY, "Authorization": f"Bearer {SUPABASE_KEY}"}
+
+
+class FileTooLarge(Exception):
+    """Raised when a file exceeds MAX_FILE_BYTES."""
+
+
+class ByteBudget:
+    """Caps the bytes of spooled files held in memory at once across the process."""
+
+    def __init__(self, limit: int):
+        self.limit = limit
+        self.in_use = 0
+
+    def try_reserve(self, size: int) -> bool:
+        # Never waits: a file that doesn't fit goes to disk instead, so files
+        # held for later (e.g. /paste's prefetch window) can't deadlock downloads.
+        if self.in_use + size > self.limit:
+            return False
+        self.in_use += size
+        return True
+
+    def release(self, size: int):
+        self.in_use -= size
+
+
+budget = ByteBudget(TRANSFER_BUDGET_BYTES)
+
+
+class _Spool(tempfile.SpooledTemporaryFile):
+    """
+    A spooled file that holds its share of the budget for as long as its
+    bytes are in memory: until it is closed or rolls over to disk.
+    """
+
+    def __init__(self, expected_size: Optional[int]):
+        size = min(expected_size or SPOOL_MEMORY_BYTES, SPOOL_MEMORY_BYTES)
+        self._reserved = size if budget.try_reserve(size) else 0
+        super().__init__(max_size=self._reserved or SPOOL_MEMORY_BYTES)
+        if not self._reserved:
+            self.rollover()
+
+    def _release(self):
+        budget.release(self._reserved)
+        self._reserved = 0
+
+    def rollover(self):
+        super().rollover()
+        self._release()
+
+    def close(self):
+        super().close()
+        self._release()
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+
+def _object_url(bucket: str, path: str) -> str:
+    return f"{_STORAGE_URL}/{bucket}/{quote(path)}"
+
+
+async def iter_file(fp, chunk_size: int = CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Yield a file object's contents in chunks (for uploading spooled files)."""
+    fp.seek(0)
+    while chunk := fp.read(chunk_size):
+        yield chunk
+
+
+async def upload(
+    session: aiohttp.ClientSession,
+    bucket: str,
+    path: str,
+    chunks: AsyncIterator[bytes],
+    size: int,
+    content_type: Optional[str] = None,
+    exist_ok: bool = False,
+):
+    """
+    Stream ``chunks`` into ``bucket/path`` without buffering the whole file.
+
+    With ``exist_ok`` an object already at ``path`` counts as success, which
+    is safe for content-addressed paths where equal paths mean equal bytes.
+    """
+    headers = {
+        **_AUTH_HEADERS,
+        "Content-Type": content_type or "application/octet-stream",
+        "Content-Length": str(size),
+        "x-upsert": "false",
+    }
+    async with session.post(_object_url(bucket, path), data=chunks, headers=headers) as resp:
+        if resp.status == 200:
+            return
+        text = await resp.text()
+        # Storage reports duplicates as 409, or as 400 with a "409"/"Duplicate" body.
+        duplicate = resp.status == 409 or (resp.status == 400 and ("Duplicate" in text or '"409"' in text))
+        if not (exist_ok and duplicate):
+            raise RuntimeError(f"storage upload returned {resp.status}: {text}")
+
+
+async def _spool(session: aiohttp.ClientSession, url: str, headers: Optional[dict] = None):
+    spool = None
+    digest = hashlib.sha256()
+    written = 0
+    try:
+        async with session.get(url, headers=headers) as resp:
+            if resp.status != 200:
+                raise RuntimeError(f"download returned {resp.status}")
+            if (resp.content_length or 0) > MAX_FILE_BYTES:
+                raise FileTooLarge(url)
+            spool = _Spool(resp.content_length)
+            async for chunk in resp.content.iter_chunked(CHUNK_SIZE):
+                written += len(chunk)
+                if written > MAX_FILE_BYTES:
+                    raise FileTooLarge(url)
+                digest.update(chunk)
+                spool.write(chunk)
+    except BaseException:
+        if spool is not None:
+            spool.close()
+        raise
+    spool.seek(0)
+    return spool, written, digest.hexdigest()
+
+
+async def fetch(session: aiohttp.ClientSession, url: str):
+    """
+    Stream any URL into a spooled temp file, hashing it on the way.
+
+    Returns ``(file, size, sha256_hex)`` with the file rewound. Small files
+    stay in memory while the budget allows; larger ones spill to disk. The
+    caller must close it to give its memory back to the budget.
+    """
+    return await _spool(session, url)
+
+
+async def download(session: aiohttp.ClientSession, bucket: str, path: str):
+    """Stream ``bucket/path`` into a spooled temp file and return it rewound."""
+    spool, _, _ = await _spool(session, _object_url(bucket, path), _AUTH_HEADERS)
+    return spool
+
+
+def stats() -> dict:
+    return {"budget_bytes": budget.limit, "in_use_bytes": budget.in_use}
@@ -1,5 +1,12 @@
 import os
-from supabase import create_client, Client
+import threading
+import time
+import httpx
+from supabase import Client, ClientOptions
+from postgrest import SyncPostgrestClient
+from postgrest.utils import SyncClient as PostgrestSession
+from storage3 import SyncStorageClient
+from storage3.utils import SyncClient as StorageSession
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -11,8 +18,125 @@ SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise ValueError("❌ Missing Supabase credentials in .env")
 
-# Initialize Supabase client
-supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
+# -------------------------------------------------------
+# Connection pool settings (override in .env)
+# -------------------------------------------------------
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))            # max open connections
+DB_POOL_KEEPALIVE = int(os.getenv("DB_POOL_KEEPALIVE", str(DB_POOL_SIZE)))  # idle connections kept warm
+DB_KEEPALIVE_EXPIRY = float(os.getenv("DB_KEEPALIVE_EXPIRY", "60"))  # seconds an idle connection lives
+DB_CONNECT_TIMEOUT = float(os.getenv("DB_CONNECT_TIMEOUT", "5"))
+DB_TIMEOUT = float(os.getenv("DB_TIMEOUT", "15"))              # PostgREST read/write timeout
+STORAGE_TIMEOUT = float(os.getenv("STORAGE_TIMEOUT", "60"))    # storage uploads/downloads
+
+
+class PoolMetrics:
+    """Thread-safe request counters for the shared connection pool."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.errors = 0
+        self.total_latency = 0.0
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+            self.requests += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def finished(self, elapsed: float, failed: bool):
+        with self._lock:
+            self.in_flight -= 1
+            self.total_latency += elapsed
+            if failed:
+                self.errors += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "pool_size": DB_POOL_SIZE,
+                "in_flight": self.in_flight,
+                "peak_in_flight": self.peak_in_flight,
+                "utilisation": self.in_flight / DB_POOL_SIZE,
+                "requests": self.requests,
+                "errors": self.errors,
+                "avg_latency_ms": (self.total_latency / self.requests * 1000) if self.requests else 0.0,
+            }
+
+
+pool_metrics = PoolMetrics()
+
+
+class _MeteredTransport(httpx.HTTPTransport):
+    """Keep-alive transport shared by every Supabase service, with usage metrics."""
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        pool_metrics.started()
+        start = time.perf_counter()
+        failed = True
+        try:
+            response = super().handle_request(request)
+            failed = response.status_code >= 500
+            return response
+        finally:
+            pool_metrics.finished(time.perf_counter() - start, failed)
+
+
+_transport = _MeteredTransport(
+    http2=True,
+    limits=httpx.Limits(
+        max_connections=DB_POOL_SIZE,
+        max_keepalive_connections=DB_POOL_KEEPALIVE,
+        keepalive_expiry=DB_KEEPALIVE_EXPIRY,
+    ),
+)
+
+
+class _PooledPostgrestClient(SyncPostgrestClient):
+    def create_session(self, base_url, headers, timeout, verify=True):
+        return PostgrestSession(
+            base_url=base_url, headers=headers, timeout=timeout,
+            follow_redirects=True, transport=_transport,
+        )
+
+
+class _PooledStorageClient(SyncStorageClient):
+    def _create_session(self, base_url, headers, timeout, verify=True):
+        return StorageSession(
+            base_url=base_url, headers=headers, timeout=timeout,
+            follow_redirects=True, transport=_transport,
+        )
+
+
+class _PooledClient(Client):
+    """Supabase client whose PostgREST and storage APIs share one connection pool."""
+
+    @staticmethod
+    def _init_postgrest_client(rest_url, headers, schema, timeout=DB_TIMEOUT):
+        return _PooledPostgrestClient(rest_url, headers=headers, schema=schema, timeout=timeout)
+
+    @staticmethod
+    def _init_storage_client(storage_url, headers, storage_client_timeout=STORAGE_TIMEOUT):
+        return _PooledStorageClient(storage_url, headers, storage_client_timeout)
+
+
+def pool_stats() -> dict:
+    """Current utilisation of the shared HTTP connection pool."""
+    return pool_metrics.snapshot()
+
+
+# Initialize the one Supabase client used by the whole process
+supabase: Client = _PooledClient(
+    SUPABASE_URL,
+    SUPABASE_KEY,
+    ClientOptions(
+        postgrest_client_timeout=httpx.Timeout(DB_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+        storage_client_timeout=httpx.Timeout(STORAGE_TIMEOUT, connect=DB_CONNECT_TIMEOUT),
+    ),
+)
 
 # -------------------------------------------------------
 # Utility functions for image sync storage
@@ -0,0 +1,94 @@
+import asyncio
+import operator
+from typing import Any, Awaitable, Callable, Dict, Hashable
+
+# ───────────────────────────────
+# 🧺 Write-Behind Coalescing Buffer
+# ───────────────────────────────
+
+
+class CoalescingBuffer:
+    """
+    Collects pending writes in memory, merging values that share a key,
+    and hands them to ``flush`` as one batch on a timer or once
+    ``max_pending`` keys have piled up.
+
+    ``merge`` defaults to addition (delta counters); pass
+    ``lambda old, new: new`` for latest-state-wins buffers.
+    A failed flush puts its batch back so nothing is lost.
+    """
+
+    def __init__(
+        self,
+        flush: Callable[[Dict[Hashable, Any]], Awaitable[None]],
+        *,
+        interval: float = 10.0,
+        max_pending: int = 500,
+        merge: Callable[[Any, Any], Any] = operator.add,
+        name: str = "WriteBuffer",
+    ):
+        self._flush_fn = flush
+        self.interval = interval
+        self.max_pending = max_pending
+        self._merge = merge
+        self.name = name
+
+        self._pending: Dict[Hashable, Any] = {}
+        self._lock = asyncio.Lock()
+        self._timer: asyncio.Task = None
+        self._early_flush: asyncio.Task = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    # ------------------- Buffering -------------------
+    def add(self, key: Hashable, value: Any = 1):
+        """Merge ``value`` into the pending entry for ``key``."""
+        if key in self._pending:
+            self._pending[key] = self._merge(self._pending[key], value)
+        else:
+            self._pending[key] = value
+
+        if len(self._pending) >= self.max_pending and (self._early_flush is None or self._early_flush.done()):
+            self._early_flush = asyncio.create_task(self.flush())
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the not-yet-flushed value for ``key``."""
+        return self._pending.get(key, default)
+
+    # ------------------- Flushing -------------------
+    async def flush(self):
+        """Write every pending entry in one batch."""
+        async with self._lock:
+            if not self._pending:
+                return
+            batch, self._pending = self._pending, {}
+            try:
+                await self._flush_fn(batch)
+            except Exception as e:
+                print(f"[{self.name}] ⚠️ Flush of {len(batch)} entries failed, will retry: {e}")
+                # The failed batch is older than anything buffered since, so merge it underneath.
+                for key, value in batch.items():
+                    if key in self._pending:
+                        self._pending[key] = self._merge(value, self._pending[key])
+                    else:
+                        self._pending[key] = value
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            # Shielded so cancelling the timer never drops a batch mid-write.
+            await asyncio.shield(self.flush())
+
+    # ------------------- Lifecycle -------------------
+    def start(self):
+        """Start the periodic flush timer on the running loop."""
+        if self._timer is None or self._timer.done():
+            self._timer = asyncio.create_task(self._run())
+
+    async def close(self):
+        """Stop the timer and write out whatever is still pending."""
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        await self.flush()